@@ -0,0 +1,182 @@
+from array import array
+from htmlnode import HTMLNode
+
+PARENT = 0
+LEAF = 1
+NONE = -1
+
+
+class DocumentArena():
+    # struct of arrays document tree, node i is described by tags[i],
+    # kinds[i], parents[i], first_child[i], next_sibling[i] and the
+    # text_start[i]:text_start[i] + text_len[i] slice of the text buffer.
+    # props are rare and live in a sparse dict keyed by node index.
+    def __init__(self):
+        self.tag_names: list[str] = [None]
+        self.tag_ids: dict[str, int] = {None: 0}
+        self.tags = array('H')
+        self.kinds = array('B')
+        self.parents = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.text_start = array('I')
+        self.text_len = array('I')
+        self.props: dict[int, dict[str, str]] = {}
+        self._chunks: list[str] = []
+        self._size = 0
+        self._buffer = ''
+        # (node, last child) for every node opened and not yet closed
+        self._open: list[list[int]] = []
+
+    def __len__(self):
+        return len(self.tags)
+
+    @property
+    def buffer(self) -> str:
+        if len(self._chunks) > 0:
+            self._buffer += ''.join(self._chunks)
+            self._chunks = []
+        return self._buffer
+
+    def _add(self, kind: int, tag: str, value: str, props: dict[str, str]) -> int:
+        index = len(self.tags)
+        tag_id = self.tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tag_names)
+            self.tag_ids[tag] = tag_id
+            self.tag_names.append(tag)
+        self.tags.append(tag_id)
+        self.kinds.append(kind)
+        self.first_child.append(NONE)
+        self.next_sibling.append(NONE)
+        self.text_start.append(self._size)
+        self.text_len.append(len(value))
+        if len(value) > 0:
+            self._chunks.append(value)
+            self._size += len(value)
+        if props:
+            self.props[index] = props
+
+        if len(self._open) == 0:
+            self.parents.append(NONE)
+        else:
+            parent = self._open[-1]
+            self.parents.append(parent[0])
+            if parent[1] == NONE:
+                self.first_child[parent[0]] = index
+            else:
+                self.next_sibling[parent[1]] = index
+            parent[1] = index
+        return index
+
+    def open(self, tag: str, props: dict[str, str] = None) -> int:
+        if tag is None:
+            raise ValueError("parent node must have a tag")
+        index = self._add(PARENT, tag, '', props)
+        self._open.append([index, NONE])
+        return index
+
+    def leaf(self, tag: str, value: str, props: dict[str, str] = None) -> int:
+        if value is None:
+            raise ValueError('leaf node must have a value')
+        return self._add(LEAF, tag, value, props)
+
+    def close(self):
+        self._open.pop()
+
+    def tag(self, index: int) -> str:
+        return self.tag_names[self.tags[index]]
+
+    def text(self, index: int) -> str:
+        start = self.text_start[index]
+        return self.buffer[start:start + self.text_len[index]]
+
+    def children(self, index: int) -> list[int]:
+        children = []
+        child = self.first_child[index]
+        while child != NONE:
+            children.append(child)
+            child = self.next_sibling[child]
+        return children
+
+    def node(self, index: int = 0) -> 'ArenaNode':
+        return ArenaNode(self, index)
+
+    def _props_html(self, index: int) -> str:
+        props = self.props.get(index)
+        if not props:
+            return ''
+        return ' ' + ' '.join(f'{key}="{value}"' for key, value in props.items())
+
+    def to_html(self, root: int = 0) -> str:
+        # walks first_child / next_sibling links with an explicit stack of
+        # open ancestors, so nesting depth is not bound by the recursion limit
+        buffer = self.buffer
+        names = self.tag_names
+        out = []
+        ancestors = []
+        index = root
+        while True:
+            tag = names[self.tags[index]]
+            if self.kinds[index] == LEAF:
+                start = self.text_start[index]
+                text = buffer[start:start + self.text_len[index]]
+                if tag is None:
+                    out.append(text)
+                else:
+                    out.append(f'<{tag}{self._props_html(index)}>{text}</{tag}>')
+            else:
+                out.append(f'<{tag}{self._props_html(index)}>')
+                child = self.first_child[index]
+                if child != NONE:
+                    ancestors.append(index)
+                    index = child
+                    continue
+                out.append(f'</{tag}>')
+
+            while True:
+                if index == root:
+                    return ''.join(out)
+                sibling = self.next_sibling[index]
+                if sibling != NONE:
+                    index = sibling
+                    break
+                index = ancestors.pop()
+                out.append(f'</{names[self.tags[index]]}>')
+
+
+class ArenaNode(HTMLNode):
+    # HTMLNode view over one arena slot, nothing is copied out of the arena
+    def __init__(self, arena: DocumentArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    @property
+    def tag(self) -> str:
+        return self.arena.tag(self.index)
+
+    @property
+    def value(self) -> str:
+        if self.arena.kinds[self.index] == PARENT:
+            return None
+        return self.arena.text(self.index)
+
+    @property
+    def children(self) -> list[HTMLNode]:
+        if self.arena.kinds[self.index] == LEAF:
+            return None
+        return [ArenaNode(self.arena, child) for child in self.arena.children(self.index)]
+
+    @property
+    def props(self) -> dict[str, str]:
+        return self.arena.props.get(self.index)
+
+    @props.setter
+    def props(self, props: dict[str, str]):
+        if props is None:
+            self.arena.props.pop(self.index, None)
+        else:
+            self.arena.props[self.index] = props
+
+    def to_html(self) -> str:
+        return self.arena.to_html(self.index)
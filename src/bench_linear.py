@@ -0,0 +1,19 @@
+import sys
+from test_linear import ADVERSARIAL, growth
+
+# per character cost of 32x and 128x larger inputs relative to 1000 units,
+# around 1 when parsing is linear
+
+
+def main():
+    failed = False
+    for name, generate in ADVERSARIAL.items():
+        results = [growth(generate, 1000, scale) for scale in (32, 128)]
+        print(f'{name:<22} ' + '  '.join(f'{result:6.2f}' for result in results))
+        failed = failed or results[-1] > 2
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
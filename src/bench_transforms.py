@@ -0,0 +1,46 @@
+import time
+from converter import markdown_to_html_node
+from transforms import Transform, HeadingAnchors, TableOfContents, ExternalLinks, UrlRewrite, apply_transforms
+
+
+class CountingTransform(Transform):
+    def begin(self):
+        self.count = 0
+
+    def visit(self, node):
+        self.count += 1
+
+
+def make_markdown(sections: int) -> str:
+    parts = ['# Benchmark']
+    for i in range(sections):
+        parts.append(f'## Section {i}')
+        parts.append(f'Some **bold** text with a [link](https://example.com/{i}) and [another](/local/{i}).')
+        parts.append(f'- item _{i}_\n- item `{i}`')
+    return '\n\n'.join(parts)
+
+
+def main():
+    markdown = make_markdown(2000)
+    pipelines = [
+        [],
+        [HeadingAnchors()],
+        [HeadingAnchors(), TableOfContents()],
+        [HeadingAnchors(), TableOfContents(), ExternalLinks()],
+        [HeadingAnchors(), TableOfContents(), ExternalLinks(), UrlRewrite('/ssg/')],
+    ]
+    for transforms in pipelines:
+        counter = CountingTransform()
+        best = None
+        for _ in range(5):
+            root = markdown_to_html_node(markdown)
+            start = time.perf_counter()
+            visits = apply_transforms(root, transforms + [counter])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        names = ', '.join(type(t).__name__ for t in transforms) or '(none)'
+        print(f'{len(transforms)} transforms: {visits} node visits, {best * 1000:.2f}ms  [{names}]')
+
+
+if __name__ == "__main__":
+    main()
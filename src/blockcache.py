@@ -0,0 +1,128 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from converter import BlockType, markdown_to_blocks, block_to_block_type, block_to_html_node
+from transforms import Transform, CollectResources, apply_transforms
+
+# part of every key, bump it with any change to how blocks are parsed,
+# transformed or serialized so html cached by an older build is not served
+BLOCK_CACHE_VERSION = 1
+
+
+def is_cacheable(block: str, block_type: BlockType) -> bool:
+    # headings feed page wide state (anchor numbering, the table of
+    # contents) and images feed first-image and budget handling, so those
+    # blocks are always parsed again
+    return block_type is not BlockType.HEADING and '![' not in block
+
+
+class BlockCache():
+    # rendered html of single blocks keyed by content hash, block type and
+    # the transform configuration, evicted least recently used first once
+    # the cached html exceeds max_bytes
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, fs = None, path: str = None):
+        self.max_bytes = max_bytes
+        self.fs = fs
+        self.path = path
+        self.entries: OrderedDict[str, tuple[str, list[str]]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+    @classmethod
+    def load(cls, fs, path: str, max_bytes: int = 32 * 1024 * 1024) -> 'BlockCache':
+        cache = cls(max_bytes, fs, path)
+        if fs.isfile(path):
+            try:
+                for key, (html, links) in json.loads(fs.read_text(path)):
+                    cache.put(key, html, links)
+            except (OSError, ValueError, TypeError):
+                # unreadable, the build starts from an empty cache
+                cache = cls(max_bytes, fs, path)
+            cache.dirty = False
+        return cache
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        self.fs.makedirs(os.path.dirname(self.path))
+        data = [[key, [html, links]] for key, (html, links) in self.entries.items()]
+        # swapped in whole, a build killed while saving leaves the old file
+        tmp_path = self.path + '.tmp'
+        self.fs.write_text(tmp_path, json.dumps(data))
+        self.fs.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def key(self, block: str, block_type: BlockType, fingerprint: str) -> str:
+        digest = hashlib.sha1(f'{fingerprint}\0{block_type.value}\0{block}'.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> tuple[str, list[str]] | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if next(reversed(self.entries)) != key:
+            # the recency order is persisted too, or the next build would
+            # evict the blocks this one used
+            self.entries.move_to_end(key)
+            self.dirty = True
+        return entry
+
+    def put(self, key: str, html: str, links: list[str]):
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key)[0])
+        self.entries[key] = (html, links)
+        self.size += len(html)
+        self.dirty = True
+        while self.size > self.max_bytes and len(self.entries) > 0:
+            _, (evicted, _) = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+
+def transforms_fingerprint(transforms: list[Transform]) -> str:
+    return repr((BLOCK_CACHE_VERSION, tuple(transform.key() for transform in transforms)))
+
+
+def markdown_to_cached_node(markdown: str, transforms: list[Transform], cache: BlockCache, resources: CollectResources) -> HTMLNode:
+    # like markdown_to_html_node followed by apply_transforms, but blocks
+    # found in the cache come back as raw html leaves and only the other
+    # blocks are parsed, transformed and serialized. resources receives
+    # the images and links of every block in document order.
+    fingerprint = transforms_fingerprint(transforms)
+    children = []
+    misses = []
+    resources.begin()
+    for block in markdown_to_blocks(markdown):
+        block_type = block_to_block_type(block)
+        cacheable = is_cacheable(block, block_type)
+        if cacheable:
+            key = cache.key(block, block_type, fingerprint)
+            entry = cache.get(key)
+            if entry is not None:
+                children.append(LeafNode(None, entry[0]))
+                resources.links.extend(entry[1])
+                continue
+
+        node = block_to_html_node(block, block_type)
+        # collected before the transforms rewrite any url
+        block_resources = CollectResources()
+        apply_transforms(node, [block_resources])
+        resources.images.extend(block_resources.images)
+        resources.links.extend(block_resources.links)
+        if cacheable:
+            misses.append((len(children), key, node, block_resources.links))
+        children.append(node)
+
+    root = ParentNode('div', children)
+    apply_transforms(root, transforms)
+
+    for index, key, node, links in misses:
+        html = node.to_html()
+        cache.put(key, html, links)
+        children[index] = LeafNode(None, html)
+    return root
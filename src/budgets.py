@@ -0,0 +1,60 @@
+import os
+
+
+class Budget():
+    # None disables a limit
+    def __init__(self, max_html_bytes: int = None, max_image_bytes: int = None, max_render_ms: float = None):
+        self.max_html_bytes = max_html_bytes
+        self.max_image_bytes = max_image_bytes
+        self.max_render_ms = max_render_ms
+
+
+class BudgetViolation():
+    def __init__(self, page: str, metric: str, value: float, limit: float):
+        self.page = page
+        self.metric = metric
+        self.value = value
+        self.limit = limit
+
+    def __eq__(self, value):
+        return (self.page, self.metric, self.value, self.limit) == (value.page, value.metric, value.value, value.limit)
+
+    def __repr__(self):
+        return f'{self.page}: {self.metric} {self.value:.10g} exceeds budget {self.limit:.10g}'
+
+
+def page_image_bytes(images: list[str], fs, static_dir: str) -> int:
+    # images are the src urls the page already collected while rendering,
+    # only local files under static_dir count
+    total = 0
+    for src in set(images):
+        if not src.startswith('/') or src.startswith('//'):
+            continue
+        path = os.path.join(static_dir, src.lstrip('/'))
+        if fs.isfile(path):
+            total += fs.size(path)
+    return total
+
+
+def check_page(page, budget: Budget, fs, static_dir: str) -> list[BudgetViolation]:
+    violations = []
+    if budget.max_html_bytes is not None and page.size > budget.max_html_bytes:
+        violations.append(BudgetViolation(page.dest, 'html bytes', page.size, budget.max_html_bytes))
+    if budget.max_image_bytes is not None:
+        image_bytes = page_image_bytes(page.images, fs, static_dir)
+        if image_bytes > budget.max_image_bytes:
+            violations.append(BudgetViolation(page.dest, 'image bytes', image_bytes, budget.max_image_bytes))
+    if budget.max_render_ms is not None:
+        render_ms = page.seconds * 1000
+        if render_ms > budget.max_render_ms:
+            violations.append(BudgetViolation(page.dest, 'render ms', round(render_ms, 2), budget.max_render_ms))
+    return violations
+
+
+def format_report(violations: list[BudgetViolation]) -> str:
+    if len(violations) == 0:
+        return 'all pages within budget'
+    lines = [f'{len(violations)} budget violations:']
+    for violation in violations:
+        lines.append(f'  {violation!r}')
+    return '\n'.join(lines)
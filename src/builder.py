@@ -0,0 +1,688 @@
+import os
+import time
+import threading
+import hashlib
+from fs import DiskFS, MemoryFS, OverlayFS
+from converter import extract_title, markdown_to_arena, markdown_to_html_node
+from transforms import Transform, CollectResources, TableOfContents, UrlRewrite, apply_transforms
+from template import Template
+from css import bundle_stylesheets
+from images import ImageIndex, ImageAttributes
+from budgets import Budget, BudgetViolation, check_page
+from blockcache import BlockCache, markdown_to_cached_node
+from memprofile import MemoryProfiler
+from hints import PageHints
+from offline import registration_script, write_service_worker
+from pack import Pack, pack_output
+from schedule import Scheduler, load_priority_list
+from htmlnode import HTMLNode
+
+
+class BuildConfig():
+    def __init__(
+        self,
+        base_path: str = '/',
+        static_dir: str = 'static',
+        content_dir: str = 'content',
+        output_dir: str = 'docs',
+        template_path: str = 'template.html',
+        transforms: list[Transform] = None,
+        inline_css_threshold: int = None,
+        image_attributes: bool = False,
+        eager_first_image: bool = True,
+        cache_dir: str = '.ssg-cache',
+        budget: Budget = None,
+        block_cache_bytes: int = None,
+        profile_memory: bool = False,
+        max_preload: int = 0,
+        max_prefetch: int = 0,
+        service_worker: bool = False,
+        pack_path: str = None,
+        schedule: bool = False,
+        priority_path: str = None,
+        background: bool = False,
+        arena: bool = False,
+        fs = None,
+        log = None,
+    ):
+        self.base_path = base_path
+        self.static_dir = static_dir
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.template_path = template_path
+        self.transforms = transforms if transforms is not None else []
+        # None disables stylesheet inlining and bundling
+        self.inline_css_threshold = inline_css_threshold
+        self.image_attributes = image_attributes
+        self.eager_first_image = eager_first_image
+        # persistent indexes kept between builds
+        self.cache_dir = cache_dir
+        self.budget = budget
+        # None disables the per block render cache
+        self.block_cache_bytes = block_cache_bytes
+        self.profile_memory = profile_memory
+        # resource hints injected into the head, 0 disables them
+        self.max_preload = max_preload
+        self.max_prefetch = max_prefetch
+        # sw.js and a precache manifest of every written file
+        self.service_worker = service_worker
+        # write the output into one pack file instead of output_dir
+        self.pack_path = pack_path
+        # render recently edited pages and those listed in priority_path
+        # first, background returns once they are written and leaves the
+        # rest of the build to BuildResult.wait()
+        self.schedule = schedule or priority_path is not None
+        self.priority_path = priority_path
+        self.background = background
+        # parse pages into a flat DocumentArena instead of one object per
+        # node, the block cache takes precedence when both are set
+        self.arena = arena
+        self.fs = fs if fs is not None else DiskFS()
+        self.log = log
+
+
+class PageResult():
+    def __init__(self, source: str, dest: str, title: str, size: int, seconds: float, images: list[str] = None):
+        self.source = source
+        self.dest = dest
+        self.title = title
+        self.size = size
+        self.seconds = seconds
+        self.images = images if images is not None else []
+
+    def __repr__(self):
+        return f'PageResult({self.source} -> {self.dest}, {self.size} bytes, {self.seconds * 1000:.2f}ms)'
+
+
+class BuildResult():
+    def __init__(self):
+        self.pages: list[PageResult] = []
+        self.static_files: list[str] = []
+        self.errors: list[tuple[str, str]] = []
+        self.budget_violations: list[BudgetViolation] = []
+        self.memory: MemoryProfiler = None
+        self.pack: Pack = None
+        self.timings: dict[str, float] = {}
+        # pages rendered and published before the rest
+        self.priority_count = 0
+        # the rest of a background build
+        self.pending: threading.Thread = None
+
+    @property
+    def ok(self) -> bool:
+        return len(self.errors) == 0
+
+    def wait(self) -> 'BuildResult':
+        if self.pending is not None:
+            self.pending.join()
+            self.pending = None
+        return self
+
+
+class _CachedPage():
+    def __init__(self, mtime: float, digest: str, key: tuple, parsed: 'ParsedPage', images: tuple = ()):
+        self.mtime = mtime
+        self.digest = digest
+        self.key = key
+        self.parsed = parsed
+        # image sizes the transforms baked into the page
+        self.images = images
+
+
+def _image_sizes(transforms: list[Transform], parsed: 'ParsedPage') -> tuple:
+    return tuple(t.sizes(parsed.images) for t in transforms if isinstance(t, ImageAttributes))
+
+
+class BuildCache():
+    # warm state kept between builds by a long running process
+    def __init__(self):
+        self.templates: dict[tuple[str, str], tuple[tuple, Template]] = {}
+        self.pages: dict[str, _CachedPage] = {}
+        self.images: dict[str, ImageIndex] = {}
+        self.blocks: dict[str, BlockCache] = {}
+        # source directory -> (mtime, entries), a directory mtime changes
+        # whenever an entry is added, removed or renamed
+        self.listings: dict[str, tuple[float, list[tuple[str, bool]]]] = {}
+        # (static file, copy) -> (mtime, size) of the source when copied
+        self.static: dict[tuple[str, str], tuple[float, int]] = {}
+        # output dir -> every file the previous build left there
+        self.outputs: dict[str, set[str]] = {}
+
+    def listing(self, path: str, fs) -> list[tuple[str, bool]]:
+        mtime = fs.mtime(path)
+        cached = self.listings.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, list_dir(path, fs))
+            self.listings[path] = cached
+        return cached[1]
+
+    def template(self, base_path: str, template_path: str, fs) -> Template:
+        partials_dir = os.path.join(os.path.dirname(template_path), 'partials')
+        signature = [fs.mtime(template_path)]
+        if fs.isdir(partials_dir):
+            for item in sorted(fs.listdir(partials_dir)):
+                signature.append((item, fs.mtime(os.path.join(partials_dir, item))))
+        signature = tuple(signature)
+
+        cached = self.templates.get((template_path, base_path))
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        template = _load_template(base_path, template_path, fs)
+        self.templates[(template_path, base_path)] = (signature, template)
+        return template
+
+    def image_index(self, path: str, fs) -> ImageIndex:
+        if path not in self.images:
+            self.images[path] = ImageIndex.load(fs, path)
+        return self.images[path]
+
+    def block_cache(self, path: str, fs, max_bytes: int) -> BlockCache:
+        if path not in self.blocks:
+            self.blocks[path] = BlockCache.load(fs, path, max_bytes)
+        self.blocks[path].max_bytes = max_bytes
+        return self.blocks[path]
+
+    def parse(self, path: str, fs, transforms: list[Transform], blocks: BlockCache = None, arena: bool = False) -> 'ParsedPage':
+        key = tuple(transform.key() for transform in transforms)
+        mtime = fs.mtime(path)
+        entry = self.pages.get(path)
+        if entry is not None and entry.key == key and entry.images != _image_sizes(transforms, entry.parsed):
+            entry = None
+        if entry is not None and entry.mtime == mtime and entry.key == key:
+            return entry.parsed
+
+        markdown = fs.read_text(path)
+        digest = hashlib.sha1(markdown.encode()).hexdigest()
+        if entry is not None and entry.digest == digest and entry.key == key:
+            entry.mtime = mtime
+            return entry.parsed
+
+        parsed = parse_page(markdown, transforms, blocks, arena)
+        self.pages[path] = _CachedPage(mtime, digest, key, parsed, _image_sizes(transforms, parsed))
+        return parsed
+
+
+def _log(log, message: str):
+    if log is not None:
+        log(message)
+
+
+def list_dir(path: str, fs) -> list[tuple[str, bool]]:
+    # (name, is directory) for the files and directories inside path
+    entries = []
+    for item in fs.listdir(path):
+        item_path = os.path.join(path, item)
+        if fs.isfile(item_path):
+            entries.append((item, False))
+        elif fs.isdir(item_path):
+            entries.append((item, True))
+    return entries
+
+
+def output_files(path: str, fs) -> set[str]:
+    # every file below path
+    files = set()
+    if not fs.isdir(path):
+        return files
+    for name, is_dir in list_dir(path, fs):
+        item_path = os.path.join(path, name)
+        if is_dir:
+            files |= output_files(item_path, fs)
+        else:
+            files.add(item_path)
+    return files
+
+
+def remove_stale(output_dir: str, stale: set[str], fs, log = None):
+    # deletes files an earlier build wrote and this one did not, then the
+    # directories that left empty
+    dirs = set()
+    for path in sorted(stale):
+        if fs.isfile(path):
+            _log(log, f'removing {path}')
+            fs.remove(path)
+        dirs.add(os.path.dirname(path))
+    root = os.path.normpath(output_dir)
+    for path in sorted(dirs, key=len, reverse=True):
+        path = os.path.normpath(path)
+        while path != root and path.startswith(root + os.sep) and fs.isdir(path) and len(fs.listdir(path)) == 0:
+            fs.rmtree(path)
+            path = os.path.dirname(path)
+
+
+def cleanup(path: str, fs = None, log = None):
+    fs = fs if fs is not None else DiskFS()
+    _log(log, 'cleanning pubic directory...')
+    if fs.exists(path):
+        fs.rmtree(path)
+    fs.makedirs(path)
+
+
+def copy_static_files(src_path: str, dst_path: str, fs = None, log = None, cache: BuildCache = None) -> list[str]:
+    # with a cache, files whose copy is still in place and whose source is
+    # unchanged since it was copied are skipped
+    fs = fs if fs is not None else DiskFS()
+    if not fs.exists(src_path):
+        raise Exception("directory 'static' not exists")
+
+    # copy
+    _log(log, 'starting copy files from static to public')
+    copied = []
+    entries = cache.listing(src_path, fs) if cache is not None else list_dir(src_path, fs)
+    for item, is_dir in entries:
+        abs_path = os.path.join(src_path, item)
+        dst_item = os.path.join(dst_path, item)
+        if not is_dir:
+            if cache is not None:
+                signature = (fs.mtime(abs_path), fs.size(abs_path))
+                if cache.static.get((abs_path, dst_item)) == signature and fs.isfile(dst_item):
+                    copied.append(dst_item)
+                    continue
+                cache.static[(abs_path, dst_item)] = signature
+            _log(log, f'copying {src_path}/{item} to {dst_path}/{item}')
+            fs.copy(abs_path, dst_item)
+            copied.append(dst_item)
+        else:
+            fs.makedirs(dst_item)
+            copied.extend(copy_static_files(abs_path, dst_item, fs, log, cache))
+    return copied
+
+
+def page_transforms(base_path: str, transforms: list[Transform] = None) -> list[Transform]:
+    transforms = list(transforms or [])
+    if base_path != '/':
+        transforms.append(UrlRewrite(base_path))
+    return transforms
+
+
+def page_url(output_dir: str, dest_path: str) -> str:
+    url = '/' + os.path.relpath(dest_path, output_dir).replace(os.sep, '/')
+    if url.endswith('/index.html'):
+        url = url[:-len('index.html')]
+    return url
+
+
+class ParsedPage():
+    # everything about a page that does not depend on the template
+    def __init__(self, title: str, content: str, toc: str = '', images: list[str] = None, links: list[str] = None):
+        self.title = title
+        self.content = content
+        self.toc = toc
+        self.images = images if images is not None else []
+        self.links = links if links is not None else []
+
+    def context(self, url: str, hints: str = '') -> dict[str, str]:
+        return {'Title': self.title, 'Content': self.content, 'TOC': self.toc, 'Url': url, 'Hints': hints}
+
+
+def page_tree(markdown: str, transforms: list[Transform], blocks: BlockCache = None, arena: bool = False) -> tuple[HTMLNode, CollectResources]:
+    resources = CollectResources()
+    if blocks is not None:
+        html_node = markdown_to_cached_node(markdown, transforms, blocks, resources)
+    elif arena:
+        # the transforms see HTMLNode views over the arena slots
+        html_node = markdown_to_arena(markdown).node()
+        apply_transforms(html_node, [resources] + transforms)
+    else:
+        html_node = markdown_to_html_node(markdown)
+        apply_transforms(html_node, [resources] + transforms)
+    return html_node, resources
+
+
+def page_from_tree(markdown: str, html_node: HTMLNode, resources: CollectResources, transforms: list[Transform]) -> ParsedPage:
+    toc = ''
+    for transform in transforms:
+        if isinstance(transform, TableOfContents):
+            toc = transform.to_html()
+    return ParsedPage(extract_title(markdown), html_node.to_html(), toc, resources.images, resources.links)
+
+
+def parse_page(markdown: str, transforms: list[Transform], blocks: BlockCache = None, arena: bool = False) -> ParsedPage:
+    html_node, resources = page_tree(markdown, transforms, blocks, arena)
+    return page_from_tree(markdown, html_node, resources, transforms)
+
+
+def render_page(base_path: str, markdown: str, template: str | Template, transforms: list[Transform] = None, url: str = '/') -> tuple[str, str]:
+    if transforms is None:
+        transforms = page_transforms(base_path)
+    if isinstance(template, str):
+        template = Template(template, base_path)
+    parsed = parse_page(markdown, transforms)
+    return parsed.title, template.render(parsed.context(url)).decode()
+
+
+class _Site():
+    # per build state shared by every page
+    def __init__(
+        self,
+        base_path: str,
+        template: Template,
+        output_dir: str,
+        fs,
+        log,
+        transforms: list[Transform],
+        on_error = None,
+        cache: BuildCache = None,
+        blocks: BlockCache = None,
+        profiler: MemoryProfiler = None,
+        hints: PageHints = None,
+        head: str = '',
+        arena: bool = False,
+    ):
+        self.base_path = base_path
+        self.template = template
+        self.output_dir = output_dir
+        self.fs = fs
+        self.log = log
+        self.transforms = transforms
+        self.on_error = on_error
+        self.cache = cache
+        self.blocks = blocks
+        self.profiler = profiler
+        self.hints = hints
+        # extra markup for the head of every page
+        self.head = head
+        self.arena = arena
+
+
+def _page_html(site: _Site, parsed: ParsedPage, dest_path: str) -> bytes:
+    url = page_url(site.output_dir, dest_path)
+    hints = site.head
+    if site.hints is not None:
+        hints = site.hints.render(url, parsed.images, parsed.links) + hints
+    return site.template.render(parsed.context(url, hints))
+
+
+def _profile_page(site: _Site, from_path: str, dest_path: str) -> tuple[ParsedPage, bytes]:
+    # same steps as parse_page and render, one tracemalloc stage each,
+    # the parsed page cache is skipped so every page does the full work
+    profiler = site.profiler
+    profiler.begin_page(from_path)
+    with profiler.stage('read'):
+        markdown = site.fs.read_text(from_path)
+    with profiler.stage('markdown_to_html_node'):
+        html_node, resources = page_tree(markdown, site.transforms, site.blocks, site.arena)
+    with profiler.stage('to_html'):
+        parsed = page_from_tree(markdown, html_node, resources, site.transforms)
+    with profiler.stage('template'):
+        html = _page_html(site, parsed, dest_path)
+    del html_node, resources
+    profiler.end_page()
+    return parsed, html
+
+
+def _generate_page(site: _Site, from_path: str, dest_path: str) -> PageResult:
+    _log(site.log, f'Generating page from {from_path} to {dest_path}')
+    start = time.perf_counter()
+
+    if site.profiler is not None:
+        parsed, html = _profile_page(site, from_path, dest_path)
+    else:
+        if site.cache is not None:
+            parsed = site.cache.parse(from_path, site.fs, site.transforms, site.blocks, site.arena)
+        else:
+            parsed = parse_page(site.fs.read_text(from_path), site.transforms, site.blocks, site.arena)
+        html = _page_html(site, parsed, dest_path)
+
+    site.fs.makedirs(os.path.dirname(dest_path))
+    site.fs.write_bytes(dest_path, html)
+
+    return PageResult(from_path, dest_path, parsed.title, len(html), time.perf_counter() - start, parsed.images)
+
+
+def _load_template(base_path: str, template_path: str, fs, text: str = None) -> Template:
+    partials_dir = os.path.join(os.path.dirname(template_path), 'partials')
+    if text is None:
+        text = fs.read_text(template_path)
+    if '{{ Hints }}' not in text:
+        # resource hints go last in the head, empty unless enabled
+        text = text.replace('</head>', '{{ Hints }}</head>', 1)
+    return Template(text, base_path, fs, partials_dir)
+
+
+def generate_page(base_path: str, from_path: str, template_path: str, dest_path: str, fs = None, log = None) -> PageResult:
+    fs = fs if fs is not None else DiskFS()
+    template = _load_template(base_path, template_path, fs)
+    site = _Site(base_path, template, os.path.dirname(dest_path), fs, log, page_transforms(base_path))
+    return _generate_page(site, from_path, dest_path)
+
+
+def page_jobs(src_dir: str, dst_dir: str, fs, cache: BuildCache = None) -> list[tuple[str, str]]:
+    # (markdown source, html destination) for every page under src_dir
+    jobs = []
+    entries = cache.listing(src_dir, fs) if cache is not None else list_dir(src_dir, fs)
+    for item, is_dir in entries:
+        src_path = os.path.join(src_dir, item)
+        dst_path = os.path.join(dst_dir, item)
+
+        if not is_dir and item.endswith('.md'):
+            name, _ = item.rsplit('.', maxsplit=1)
+            jobs.append((src_path, os.path.join(dst_dir, f'{name}.html')))
+        elif is_dir:
+            jobs.extend(page_jobs(src_path, dst_path, fs, cache))
+    return jobs
+
+
+def _render(site: _Site, jobs: list[tuple[str, str]], on_page = None) -> list[PageResult]:
+    pages = []
+    for src_path, dst_path in jobs:
+        try:
+            pages.append(_generate_page(site, src_path, dst_path))
+        except Exception as e:
+            if site.on_error is None:
+                raise
+            site.on_error(src_path, e)
+            continue
+        if on_page is not None:
+            on_page(pages[-1])
+    return pages
+
+
+def _generate(site: _Site, src_dir: str, dst_dir: str) -> list[PageResult]:
+    jobs = page_jobs(src_dir, dst_dir, site.fs)
+    if site.hints is not None:
+        site.hints.set_pages([page_url(site.output_dir, dst_path) for _, dst_path in jobs])
+    return _render(site, jobs)
+
+
+def generate_pages_recursive(base_path: str, src_dir: str, template_path: str, dst_dir: str, fs = None, log = None) -> list[PageResult]:
+    fs = fs if fs is not None else DiskFS()
+    template = _load_template(base_path, template_path, fs)
+    site = _Site(base_path, template, dst_dir, fs, log, page_transforms(base_path))
+    return _generate(site, src_dir, dst_dir)
+
+
+def build(config: BuildConfig, cache: BuildCache = None) -> BuildResult:
+    fs = config.fs
+    if config.pack_path is not None:
+        # the output tree only exists in memory until it is packed
+        fs = OverlayFS(config.fs, config.output_dir, MemoryFS())
+    log = config.log
+    result = BuildResult()
+
+    def on_error(path: str, e: Exception):
+        _log(log, f'error: {path}: {e}')
+        result.errors.append((path, str(e)))
+
+    start = time.perf_counter()
+    # a warm cache knows what the previous build wrote, so the output is
+    # overwritten in place and only stale files are removed at the end.
+    # a scheduled build does the same with whatever is there, the site
+    # stays up while the tail renders.
+    previous = None
+    if cache is not None and config.pack_path is None:
+        previous = cache.outputs.get(config.output_dir)
+    if previous is None and config.schedule and config.pack_path is None:
+        previous = output_files(config.output_dir, fs)
+    if previous is None:
+        cleanup(config.output_dir, fs, log)
+    else:
+        fs.makedirs(config.output_dir)
+    result.timings['cleanup'] = time.perf_counter() - start
+
+    stage = time.perf_counter()
+    try:
+        result.static_files = copy_static_files(config.static_dir, config.output_dir, fs, log, cache)
+    except Exception as e:
+        on_error(config.static_dir, e)
+    result.timings['static'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    site = None
+    images = None
+    blocks = None
+    profiler = None
+    scheduler = None
+    priority_count = 0
+    tail = []
+    try:
+        if config.inline_css_threshold is not None:
+            # done once per build, every page shares the rewritten head
+            text, bundle = bundle_stylesheets(
+                fs.read_text(config.template_path),
+                fs,
+                config.static_dir,
+                config.output_dir,
+                config.inline_css_threshold,
+                config.base_path,
+            )
+            if bundle is not None:
+                result.static_files.append(bundle)
+            template = _load_template(config.base_path, config.template_path, fs, text)
+        elif cache is not None:
+            template = cache.template(config.base_path, config.template_path, fs)
+        else:
+            template = _load_template(config.base_path, config.template_path, fs)
+    except Exception as e:
+        on_error(config.template_path, e)
+    else:
+        transforms = list(config.transforms)
+        if config.image_attributes:
+            index_path = os.path.join(config.cache_dir, 'images.json')
+            images = cache.image_index(index_path, fs) if cache is not None else ImageIndex.load(fs, index_path)
+            transforms.append(ImageAttributes(images, config.static_dir, config.eager_first_image))
+        transforms = page_transforms(config.base_path, transforms)
+        if config.block_cache_bytes is not None:
+            blocks_path = os.path.join(config.cache_dir, 'blocks.json')
+            if cache is not None:
+                blocks = cache.block_cache(blocks_path, fs, config.block_cache_bytes)
+            else:
+                blocks = BlockCache.load(fs, blocks_path, config.block_cache_bytes)
+        if config.profile_memory:
+            profiler = MemoryProfiler()
+            result.memory = profiler
+        hints = None
+        if config.max_preload > 0 or config.max_prefetch > 0:
+            hints = PageHints(config.base_path, config.max_preload, config.max_prefetch)
+        site = _Site(
+            config.base_path,
+            template,
+            config.output_dir,
+            fs,
+            log,
+            transforms,
+            on_error=on_error,
+            cache=cache,
+            blocks=blocks,
+            profiler=profiler,
+            hints=hints,
+            head=registration_script(config.base_path) if config.service_worker else '',
+            arena=config.arena,
+        )
+        jobs = page_jobs(config.content_dir, config.output_dir, fs, cache)
+        urls = [page_url(config.output_dir, dst_path) for _, dst_path in jobs]
+        if hints is not None:
+            hints.set_pages(urls)
+        if config.schedule:
+            priority = []
+            if config.priority_path is not None:
+                priority = load_priority_list(fs, config.priority_path, config.base_path)
+            scheduler = Scheduler.load(fs, os.path.join(config.cache_dir, 'schedule.json'), priority)
+            jobs, priority_count = scheduler.order(jobs, urls)
+
+        def on_page(page: PageResult):
+            if len(result.pages) == 0:
+                result.timings['first_page'] = time.perf_counter() - start
+            result.pages.append(page)
+
+        if profiler is not None:
+            profiler.start()
+        try:
+            # written as soon as each one is rendered, so these are published
+            # before the tail is started
+            _render(site, jobs[:priority_count], on_page)
+        except Exception:
+            if profiler is not None:
+                profiler.stop()
+            raise
+        tail = jobs[priority_count:]
+        if scheduler is not None and config.pack_path is not None and priority_count > 0 and len(tail) > 0:
+            # a pack is only read through its index, so the priority pages
+            # go in now and the rest when the tail is done
+            written = result.static_files + [page.dest for page in result.pages]
+            try:
+                pack_output(fs, config.output_dir, written, config.fs, config.pack_path, partial=True)
+            except Exception as e:
+                on_error(config.pack_path, e)
+        if scheduler is not None:
+            result.timings['priority_pages'] = time.perf_counter() - start
+            result.priority_count = priority_count
+
+    def finish():
+        if site is not None:
+            try:
+                _render(site, tail, on_page)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+            if images is not None:
+                images.save()
+            if blocks is not None:
+                blocks.save()
+            if scheduler is not None:
+                scheduler.save()
+        result.timings['pages'] = time.perf_counter() - stage
+
+        if config.service_worker:
+            offline_start = time.perf_counter()
+            written = result.static_files + [page.dest for page in result.pages]
+            try:
+                result.static_files.extend(write_service_worker(written, config.output_dir, config.base_path, fs))
+            except Exception as e:
+                on_error(config.output_dir, e)
+            result.timings['offline'] = time.perf_counter() - offline_start
+
+        if config.pack_path is not None:
+            pack_start = time.perf_counter()
+            written = result.static_files + [page.dest for page in result.pages]
+            try:
+                result.pack = pack_output(fs, config.output_dir, written, config.fs, config.pack_path)
+                _log(log, f'packed {len(result.pack.entries)} files into {config.pack_path}, appended {result.pack.appended} bytes')
+            except Exception as e:
+                on_error(config.pack_path, e)
+            result.timings['pack'] = time.perf_counter() - pack_start
+
+        if config.budget is not None:
+            for page in result.pages:
+                result.budget_violations.extend(check_page(page, config.budget, fs, config.static_dir))
+
+        if previous is not None or cache is not None and config.pack_path is None:
+            written = set(result.static_files) | {page.dest for page in result.pages}
+            if previous is not None:
+                remove_stale(config.output_dir, previous - written, fs, log)
+            if cache is not None:
+                cache.outputs[config.output_dir] = written
+
+        result.timings['total'] = time.perf_counter() - start
+
+    if config.background and len(tail) > 0:
+        def run():
+            try:
+                finish()
+            except Exception as e:
+                on_error(config.content_dir, e)
+        result.pending = threading.Thread(target=run, name='ssg-build-tail')
+        result.pending.start()
+    else:
+        finish()
+    return result
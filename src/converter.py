@@ -1,25 +1,30 @@
 from enum import Enum
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode, ParentNode
+from arena import DocumentArena
 import re
 
-def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
+def text_node_to_leaf(text_node: TextNode) -> tuple[str, str, dict[str, str]]:
     match text_node.text_type:
         case TextType.PLAIN:
-            return LeafNode('span', text_node.text)
+            return 'span', text_node.text, None
         case TextType.BOLD:
-            return LeafNode('b', text_node.text)
+            return 'b', text_node.text, None
         case TextType.ITALIC:
-            return LeafNode('i', text_node.text)
+            return 'i', text_node.text, None
         case TextType.CODE:
-            return LeafNode('code', text_node.text)
+            return 'code', text_node.text, None
         case TextType.LINK:
-            return LeafNode('a', text_node.text, props={"href": text_node.url})
+            return 'a', text_node.text, {"href": text_node.url}
         case TextType.IMAGE:
-            return LeafNode('img', "", props={"src": text_node.url, "alt": text_node.text})
+            return 'img', "", {"src": text_node.url, "alt": text_node.text}
         case _:
             raise Exception(f'unknown text node type: {text_node.text_type}')
 
+def text_node_to_html_node(text_node: TextNode) -> HTMLNode:
+    tag, value, props = text_node_to_leaf(text_node)
+    return LeafNode(tag, value, props=props)
+
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
     result_nodes = []
     for old_node in old_nodes:
@@ -42,67 +47,47 @@ def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type:
 
     return result_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
 def extract_markdown_images(text: str):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    maches = re.findall(pattern, text)
-    return maches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text: str):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    maches = re.findall(pattern, text)
-    return maches
+    return LINK_PATTERN.findall(text)
 
-def split_nodes_image(old_nodes: list[TextNode]):
+def _split_nodes_pattern(old_nodes: list[TextNode], pattern: re.Pattern, text_type: TextType) -> list[TextNode]:
+    # one left to right scan per node, the text between matches is sliced
+    # out by position instead of splitting the remaining text again
     result_nodes = []
     for old_node in old_nodes:
         if old_node.text_type is not TextType.PLAIN:
             result_nodes.append(old_node)
             continue
 
-        images = extract_markdown_images(old_node.text)
-        if len(images) == 0:
-            result_nodes.append(old_node)
-        else:
-            rest_text = old_node.text
-            for image in images:
-                alt, url = image
-                head, rest_text = rest_text.split(f'![{alt}]({url})', maxsplit=1)
-
-                if head != '':
-                    result_nodes.append(TextNode(head, TextType.PLAIN))
-                result_nodes.append(TextNode(alt, TextType.IMAGE, url))
-
-            if rest_text != '':
-                result_nodes.append(TextNode(rest_text, TextType.PLAIN))
-
-    return result_nodes
-
+        text = old_node.text
+        end = 0
+        for match in pattern.finditer(text):
+            if match.start() > end:
+                result_nodes.append(TextNode(text[end:match.start()], TextType.PLAIN))
+            alt, url = match.groups()
+            result_nodes.append(TextNode(alt, text_type, url))
+            end = match.end()
 
-def split_nodes_link(old_nodes: list[TextNode]):
-    result_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type is not TextType.PLAIN:
+        if end == 0:
             result_nodes.append(old_node)
-            continue
+        elif end < len(text):
+            result_nodes.append(TextNode(text[end:], TextType.PLAIN))
 
-        links = extract_markdown_links(old_node.text)
-        if len(links) == 0:
-            result_nodes.append(old_node)
-        else:
-            rest_text = old_node.text
-            for link in links:
-                alt, url = link
-                head, rest_text = rest_text.split(f'[{alt}]({url})', maxsplit=1)
+    return result_nodes
 
-                if head != '':
-                    result_nodes.append(TextNode(head, TextType.PLAIN))
-                result_nodes.append(TextNode(alt, TextType.LINK, url))
+def split_nodes_image(old_nodes: list[TextNode]):
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
-            if rest_text != '':
-                result_nodes.append(TextNode(rest_text, TextType.PLAIN))
 
-    return result_nodes
+def split_nodes_link(old_nodes: list[TextNode]):
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
 
 def text_to_textnodes(text: str) -> list[TextNode]:
     node = TextNode(text, TextType.PLAIN)
@@ -137,84 +122,104 @@ def block_to_block_type(block: str) -> BlockType:
     if block.startswith('```') and block.endswith('```'):
         return BlockType.CODE
 
-    if all(line.startswith('>') for line in block.split('\n')):
+    # the lines are split once and each check stops at the first line
+    # that does not fit
+    lines = block.split('\n')
+    if all(line.startswith('>') for line in lines):
         return BlockType.QUOTE
 
-    if all(line.startswith('* ') or line.startswith('- ') for line in block.split('\n')):
+    if all(line.startswith(('* ', '- ')) for line in lines):
         return BlockType.UNORDERED_LIST
 
-    if all(re.match(r'^\d+\. ', line) for line in block.split('\n')):
-        i = 1
-        for line in block.split('\n'):
-            if not line.startswith(f'{i}. '):
-                return BlockType.PARAGRAPH
-            i += 1
+    # numbered 1. 2. 3. ... in order, anything else is a paragraph
+    if all(line.startswith(f'{i}. ') for i, line in enumerate(lines, 1)):
         return BlockType.ORDERED_LIST
 
     return BlockType.PARAGRAPH
 
-def block_to_children(block: str) -> list[HTMLNode]:
-    nodes = []
-    text = block.replace('\n', ' ')
-    text_to_textnodes(text)
-    textnodes = text_to_textnodes(text)
-    htmlnodes = list(map(text_node_to_html_node, textnodes))
-    nodes.extend(htmlnodes)
-    return nodes
+class NodeBuilder():
+    # builds HTMLNode trees from open/leaf/close calls, the same calls
+    # DocumentArena accepts
+    def __init__(self):
+        self.stack: list[list[HTMLNode]] = [[]]
+        self.opened: list[tuple[str, dict]] = []
+
+    def open(self, tag: str, props: dict[str, str] = None):
+        self.stack.append([])
+        self.opened.append((tag, props))
+
+    def leaf(self, tag: str, value: str, props: dict[str, str] = None):
+        self.stack[-1].append(LeafNode(tag, value, props=props))
+
+    def close(self):
+        children = self.stack.pop()
+        tag, props = self.opened.pop()
+        self.stack[-1].append(ParentNode(tag, children, props))
+
+    def root(self) -> HTMLNode:
+        return self.stack[0][0]
+
+def _emit_text(text: str, sink):
+    for textnode in text_to_textnodes(text):
+        sink.leaf(*text_node_to_leaf(textnode))
+
+def emit_block(block: str, block_type: BlockType, sink):
+    match block_type:
+        case BlockType.PARAGRAPH:
+            sink.open('p')
+            _emit_text(block.replace('\n', ' '), sink)
+            sink.close()
+        case BlockType.HEADING:
+            leading, body = block.split(' ', maxsplit=1)
+            lvl = len(leading)
+            sink.open(f'h{lvl}')
+            _emit_text(body.replace('\n', ' '), sink)
+            sink.close()
+        case BlockType.CODE:
+            body = block.strip('```')
+            sink.open('pre')
+            sink.leaf('code', body)
+            sink.close()
+        case BlockType.QUOTE:
+            body = '\n'.join(line.lstrip('> ') for line in block.split('\n'))
+            sink.open('blockquote')
+            _emit_text(body.replace('\n', ' '), sink)
+            sink.close()
+        case BlockType.UNORDERED_LIST:
+            sink.open('ul')
+            for line in block.split('\n'):
+                sink.open('li')
+                _emit_text(line[2:], sink)
+                sink.close()
+            sink.close()
+        case BlockType.ORDERED_LIST:
+            sink.open('ol')
+            for line in block.split('\n'):
+                sink.open('li')
+                _emit_text(line.split('. ', 1)[1], sink)
+                sink.close()
+            sink.close()
+
+def emit_markdown(markdown: str, sink):
+    sink.open('div')
+    for block in markdown_to_blocks(markdown):
+        emit_block(block, block_to_block_type(block), sink)
+    sink.close()
+
+def block_to_html_node(block: str, block_type: BlockType) -> HTMLNode:
+    builder = NodeBuilder()
+    emit_block(block, block_type, builder)
+    return builder.root()
 
 def markdown_to_html_node(markdown: str) -> HTMLNode:
-    blocks = markdown_to_blocks(markdown)
-
-    nodes = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        match block_type:
-            case BlockType.PARAGRAPH:
-                children = block_to_children(block)
-                node = ParentNode('p', children)
-                nodes.append(node)
-            case BlockType.HEADING:
-                leading, body = block.split(' ', maxsplit=1)
-                lvl = len(leading)
-                children = block_to_children(body)
-                node = ParentNode(f'h{lvl}', children)
-                nodes.append(node)
-            case BlockType.CODE:
-                body = block.strip('```')
-                node = ParentNode('pre', [
-                    LeafNode('code', body)
-                ])
-                nodes.append(node)
-            case BlockType.QUOTE:
-                body = '\n'.join(line.lstrip('> ') for line in block.split('\n'))
-                children = block_to_children(body)
-                node = ParentNode('blockquote', children)
-                nodes.append(node)
-            case BlockType.UNORDERED_LIST:
-                lines = block.split('\n')
-                children = []
-                for line in lines:
-                    line_content = line[2:]
-                    textnodes = text_to_textnodes(line_content)
-                    htmlnodes = list(map(text_node_to_html_node, textnodes))
-                    li = ParentNode('li', htmlnodes)
-                    children.append(li)
-                node = ParentNode('ul', children)
-                nodes.append(node)
-            case BlockType.ORDERED_LIST:
-                lines = block.split('\n')
-                children = []
-                for line in lines:
-                    line_content = line.split('. ', 1)[1]
-                    textnodes = text_to_textnodes(line_content)
-                    htmlnodes = list(map(text_node_to_html_node, textnodes))
-                    li = ParentNode('li', htmlnodes)
-                    children.append(li)
-                node = ParentNode('ol', children)
-                nodes.append(node)
-
-    root = ParentNode('div', nodes)
-    return root
+    builder = NodeBuilder()
+    emit_markdown(markdown, builder)
+    return builder.root()
+
+def markdown_to_arena(markdown: str) -> DocumentArena:
+    arena = DocumentArena()
+    emit_markdown(markdown, arena)
+    return arena
 
 def extract_title(markdown: str) -> str:
     headers = re.findall(r'^# (.*)', markdown)
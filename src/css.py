@@ -0,0 +1,74 @@
+import os
+import re
+import hashlib
+import posixpath
+
+LINK_PATTERN = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+HREF_PATTERN = re.compile(r'\bhref="([^"]*)"')
+URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def find_stylesheets(html: str) -> list[tuple[str, str]]:
+    # (link tag, href) for every local stylesheet link in html
+    sheets = []
+    for match in LINK_PATTERN.finditer(html):
+        tag = match.group(0)
+        href = HREF_PATTERN.search(tag)
+        if 'rel="stylesheet"' not in tag or href is None:
+            continue
+        url = href.group(1)
+        if url.startswith('/') and not url.startswith('//'):
+            sheets.append((tag, url))
+    return sheets
+
+
+def minify_css(css: str) -> str:
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def absolute_urls(css: str, href: str, base_path: str = '/') -> str:
+    # inlined and bundled css no longer lives next to its assets
+    directory = posixpath.dirname(href)
+
+    def replace(match: re.Match) -> str:
+        url = match.group(2)
+        if url.startswith(('/', 'data:', 'http:', 'https:', '#')):
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(directory, url)).lstrip('/')
+        return f'url({base_path}{path})'
+
+    return URL_PATTERN.sub(replace, css)
+
+
+def bundle_stylesheets(template: str, fs, static_dir: str, output_dir: str, inline_threshold: int, base_path: str = '/') -> tuple[str, str]:
+    # inline small or data-critical stylesheets into the template and merge
+    # the rest into one fingerprinted file written to output_dir,
+    # returns the new template and the bundle path (or None)
+    bundled = []
+    first_bundled = None
+    for tag, href in find_stylesheets(template):
+        css = minify_css(fs.read_text(os.path.join(static_dir, href.lstrip('/'))))
+        css = absolute_urls(css, href, base_path)
+        if 'data-critical' in tag or len(css.encode()) <= inline_threshold:
+            template = template.replace(tag, f'<style>{css}</style>', 1)
+            continue
+        bundled.append(css)
+        if first_bundled is None:
+            first_bundled = tag
+        else:
+            template = template.replace(tag, '', 1)
+
+    if first_bundled is None:
+        return template, None
+
+    css = '\n'.join(bundled)
+    name = f'bundle.{hashlib.sha1(css.encode()).hexdigest()[:10]}.css'
+    path = os.path.join(output_dir, name)
+    fs.write_text(path, css)
+    template = template.replace(first_bundled, f'<link href="/{name}" rel="stylesheet" />', 1)
+    return template, path
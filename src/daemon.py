@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import socket
+import argparse
+import tempfile
+import socketserver
+from fs import DiskFS
+from builder import BuildCache, BuildConfig, build, page_transforms, parse_page
+from main import BUILD_OPTIONS, add_build_options, build_options, config_options
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f'ssg-{os.getuid()}.sock')
+
+
+def _config_from_request(request: dict) -> BuildConfig:
+    cwd = request.get('cwd', '.')
+    # the same options main.py takes, an option this daemon does not know
+    # would silently build something else, so it fails the request
+    options = request.get('options', {})
+    unknown = sorted(set(options) - set(BUILD_OPTIONS))
+    if len(unknown) > 0:
+        raise Exception(f'unknown build options: {", ".join(unknown)}')
+    options = config_options(options)
+    for name in ('pack_path', 'priority_path'):
+        if options.get(name) is not None:
+            options[name] = os.path.join(cwd, options[name])
+    return BuildConfig(
+        base_path=request.get('base_path', '/'),
+        static_dir=os.path.join(cwd, request.get('static_dir', 'static')),
+        content_dir=os.path.join(cwd, request.get('content_dir', 'content')),
+        output_dir=os.path.join(cwd, request.get('output_dir', 'docs')),
+        template_path=os.path.join(cwd, request.get('template_path', 'template.html')),
+        cache_dir=os.path.join(cwd, '.ssg-cache'),
+        **options,
+    )
+
+
+def _build_response(config: BuildConfig, cache: BuildCache = None) -> dict:
+    result = build(config, cache)
+    return {
+        'ok': result.ok,
+        'pages': len(result.pages),
+        'errors': result.errors,
+        'budget_violations': [repr(violation) for violation in result.budget_violations],
+        'timings': result.timings,
+    }
+
+
+def _render_response(config: BuildConfig, markdown: str, url: str, cache: BuildCache) -> dict:
+    template = cache.template(config.base_path, config.template_path, config.fs)
+    parsed = parse_page(markdown, page_transforms(config.base_path, config.transforms))
+    html = template.render(parsed.context(url))
+    return {'ok': True, 'title': parsed.title, 'html': html.decode()}
+
+
+def handle_request(request: dict, cache: BuildCache) -> dict:
+    op = request.get('op')
+    try:
+        if op == 'ping':
+            return {'ok': True}
+        if op == 'build':
+            return _build_response(_config_from_request(request), cache)
+        if op == 'render':
+            config = _config_from_request(request)
+            return _render_response(config, request['markdown'], request.get('url', '/'), cache)
+        return {'ok': False, 'error': f'unknown op: {op}'}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        # requests are served one connection at a time, a client that goes
+        # quiet is dropped so it cannot hold up everyone else
+        self.timeout = self.server.idle_timeout
+        super().setup()
+
+    def handle(self):
+        try:
+            self._serve()
+        except TimeoutError:
+            pass
+
+    def _serve(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                self._send({'ok': False, 'error': f'malformed request: {e}'})
+                continue
+            if not isinstance(request, dict):
+                self._send({'ok': False, 'error': 'malformed request: expected an object'})
+                continue
+            if request.get('op') == 'shutdown':
+                self._send({'ok': True})
+                self.server.stopping = True
+                return
+            self._send(handle_request(request, self.server.cache))
+
+    def _send(self, response: dict):
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+        self.wfile.flush()
+
+
+class BuildServer(socketserver.UnixStreamServer):
+    # requests are handled one at a time so the warm cache needs no locking
+    def __init__(self, socket_path: str, idle_timeout: float = 5.0):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.cache = BuildCache()
+        self.stopping = False
+
+    def serve(self):
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+def send_request(socket_path: str, request: dict) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+def request_or_fallback(socket_path: str, request: dict) -> dict:
+    # ask the daemon, or do the work in this process when none is running
+    try:
+        return send_request(socket_path, request)
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+    if request['op'] == 'build':
+        return _build_response(_config_from_request(request))
+    if request['op'] == 'render':
+        return handle_request(request, BuildCache())
+    return {'ok': False, 'error': 'daemon is not running'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='warm build daemon and client')
+    parser.add_argument('--socket', default=os.environ.get('SSG_SOCKET', DEFAULT_SOCKET))
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('serve')
+    commands.add_parser('stop')
+    commands.add_parser('ping')
+    build_parser = commands.add_parser('build')
+    build_parser.add_argument('base_path', nargs='?', default='/')
+    add_build_options(build_parser)
+    build_parser.add_argument('--fail-on-budget', action='store_true', help='exit non-zero when a budget is exceeded')
+    render_parser = commands.add_parser('render')
+    render_parser.add_argument('path')
+    render_parser.add_argument('--base-path', default='/')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        print(f'listening on {args.socket}')
+        BuildServer(args.socket).serve()
+        return
+
+    if args.command == 'build':
+        request = {'op': 'build', 'cwd': os.getcwd(), 'base_path': args.base_path, 'options': build_options(args)}
+    elif args.command == 'render':
+        markdown = DiskFS().read_text(args.path)
+        request = {'op': 'render', 'cwd': os.getcwd(), 'base_path': args.base_path, 'markdown': markdown}
+    else:
+        request = {'op': 'shutdown' if args.command == 'stop' else 'ping'}
+
+    response = request_or_fallback(args.socket, request)
+    if args.command == 'render' and response['ok']:
+        print(response['html'])
+    elif args.command == 'build' and 'pages' in response:
+        print(f'built {response["pages"]} pages in {response["timings"]["total"] * 1000:.1f}ms')
+        for violation in response['budget_violations']:
+            print(violation)
+        for path, message in response['errors']:
+            print(f'{path}: {message}', file=sys.stderr)
+        if args.fail_on_budget and len(response['budget_violations']) > 0:
+            sys.exit(1)
+    if not response['ok']:
+        if 'error' in response:
+            print(response['error'], file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from fs import MemoryFS
+
+TEMPLATE = '<html><head><title>{{ Title }}</title><link href="/index.css" rel="stylesheet" /></head><body>{{ Content }}</body></html>'
+
+# the site the tests build, a test passes only the files it needs changed,
+# None drops a file
+SITE = {
+    "template.html": TEMPLATE,
+    "static/index.css": "body {}",
+    "static/images/a.png": b"\x89PNG",
+    "content/index.md": "# Home\n\n[post](/blog/post)",
+    "content/blog/post/index.md": "# Post\n\nSome **bold** text.",
+}
+
+
+def site_files(files: dict[str, str | bytes] = None) -> dict[str, str | bytes]:
+    merged = dict(SITE)
+    if files is not None:
+        merged.update(files)
+    return {path: data for path, data in merged.items() if data is not None}
+
+
+def make_site(files: dict[str, str | bytes] = None) -> MemoryFS:
+    return MemoryFS(site_files(files))
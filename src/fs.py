@@ -0,0 +1,267 @@
+import os
+import shutil
+import posixpath
+
+
+class DiskFS():
+    def __init__(self, root: str = '.'):
+        self.root = root
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self.root, path)
+
+    def read_bytes(self, path: str) -> bytes:
+        with open(self._path(path), 'rb') as f:
+            return f.read()
+
+    def read_text(self, path: str) -> str:
+        with open(self._path(path), 'r') as f:
+            return f.read()
+
+    def read_range(self, path: str, offset: int, length: int) -> bytes:
+        with open(self._path(path), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def write_bytes(self, path: str, data: bytes):
+        with open(self._path(path), 'wb') as f:
+            f.write(data)
+
+    def write_text(self, path: str, text: str):
+        with open(self._path(path), 'w') as f:
+            f.write(text)
+
+    def append_bytes(self, path: str, data: bytes):
+        with open(self._path(path), 'ab') as f:
+            f.write(data)
+
+    def remove(self, path: str):
+        os.remove(self._path(path))
+
+    def replace(self, src_path: str, dst_path: str):
+        os.replace(self._path(src_path), self._path(dst_path))
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(self._path(path))
+
+    def isfile(self, path: str) -> bool:
+        return os.path.isfile(self._path(path))
+
+    def isdir(self, path: str) -> bool:
+        return os.path.isdir(self._path(path))
+
+    def listdir(self, path: str) -> list[str]:
+        return os.listdir(self._path(path))
+
+    def makedirs(self, path: str):
+        os.makedirs(self._path(path), exist_ok=True)
+
+    def rmtree(self, path: str):
+        shutil.rmtree(self._path(path))
+
+    def copy(self, src_path: str, dst_path: str):
+        shutil.copyfile(self._path(src_path), self._path(dst_path))
+
+    def mtime(self, path: str) -> float:
+        return os.path.getmtime(self._path(path))
+
+    def size(self, path: str) -> int:
+        return os.path.getsize(self._path(path))
+
+
+class MemoryFS():
+    def __init__(self, files: dict[str, bytes | str] = None):
+        self.files: dict[str, bytes] = {}
+        # directory -> names of the files and directories directly inside
+        self.dirs: dict[str, set[str]] = {'.': set()}
+        # files and directories, a directory changes when its entries do
+        self.mtimes: dict[str, float] = {'.': 0.0}
+        self._clock = 0.0
+        for path, data in (files or {}).items():
+            if isinstance(data, str):
+                data = data.encode()
+            self.makedirs(posixpath.dirname(self._norm(path)))
+            self.write_bytes(path, data)
+
+    def _norm(self, path: str) -> str:
+        path = posixpath.normpath(path.replace(os.sep, '/'))
+        return path.lstrip('/') or '.'
+
+    def _link(self, path: str):
+        parent = posixpath.dirname(path) or '.'
+        names = self.dirs[parent]
+        if posixpath.basename(path) not in names:
+            names.add(posixpath.basename(path))
+            self._clock += 1
+            self.mtimes[parent] = self._clock
+
+    def _unlink(self, path: str):
+        parent = posixpath.dirname(path) or '.'
+        self.dirs[parent].discard(posixpath.basename(path))
+        self._clock += 1
+        self.mtimes[parent] = self._clock
+
+    def read_bytes(self, path: str) -> bytes:
+        path = self._norm(path)
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return self.files[path]
+
+    def read_text(self, path: str) -> str:
+        return self.read_bytes(path).decode()
+
+    def read_range(self, path: str, offset: int, length: int) -> bytes:
+        return self.read_bytes(path)[offset:offset + length]
+
+    def write_bytes(self, path: str, data: bytes):
+        path = self._norm(path)
+        parent = posixpath.dirname(path) or '.'
+        if parent not in self.dirs:
+            raise FileNotFoundError(parent)
+        self.files[path] = bytes(data)
+        self._link(path)
+        self._clock += 1
+        self.mtimes[path] = self._clock
+
+    def write_text(self, path: str, text: str):
+        self.write_bytes(path, text.encode())
+
+    def append_bytes(self, path: str, data: bytes):
+        previous = self.files.get(self._norm(path), b'')
+        self.write_bytes(path, previous + data)
+
+    def replace(self, src_path: str, dst_path: str):
+        data = self.read_bytes(src_path)
+        self.write_bytes(dst_path, data)
+        self.remove(src_path)
+
+    def remove(self, path: str):
+        path = self._norm(path)
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        del self.files[path]
+        del self.mtimes[path]
+        self._unlink(path)
+
+    def exists(self, path: str) -> bool:
+        return self.isfile(path) or self.isdir(path)
+
+    def isfile(self, path: str) -> bool:
+        return self._norm(path) in self.files
+
+    def isdir(self, path: str) -> bool:
+        return self._norm(path) in self.dirs
+
+    def listdir(self, path: str) -> list[str]:
+        path = self._norm(path)
+        if path not in self.dirs:
+            raise FileNotFoundError(path)
+        return sorted(self.dirs[path])
+
+    def makedirs(self, path: str):
+        path = self._norm(path)
+        missing = []
+        while path not in self.dirs:
+            missing.append(path)
+            path = posixpath.dirname(path) or '.'
+        for path in reversed(missing):
+            self.dirs[path] = set()
+            self._clock += 1
+            self.mtimes[path] = self._clock
+            self._link(path)
+
+    def rmtree(self, path: str):
+        path = self._norm(path)
+        if path not in self.dirs:
+            raise FileNotFoundError(path)
+        prefix = path + '/'
+        self.files = {k: v for k, v in self.files.items() if not k.startswith(prefix)}
+        self.dirs = {d: names for d, names in self.dirs.items() if d != path and not d.startswith(prefix)}
+        self.mtimes = {k: v for k, v in self.mtimes.items() if k in self.files or k in self.dirs}
+        if path != '.':
+            self._unlink(path)
+
+    def copy(self, src_path: str, dst_path: str):
+        self.write_bytes(dst_path, self.read_bytes(src_path))
+
+    def mtime(self, path: str) -> float:
+        path = self._norm(path)
+        if path not in self.mtimes:
+            raise FileNotFoundError(path)
+        return self.mtimes[path]
+
+    def size(self, path: str) -> int:
+        return len(self.read_bytes(path))
+
+
+class OverlayFS():
+    # paths under prefix go to upper, everything else to lower. used to keep
+    # the output tree of a build in memory while sources come from disk.
+    def __init__(self, lower, prefix: str, upper):
+        self.lower = lower
+        self.prefix = posixpath.normpath(prefix.replace(os.sep, '/'))
+        self.upper = upper
+
+    def _fs(self, path: str):
+        path = posixpath.normpath(path.replace(os.sep, '/'))
+        if path == self.prefix or path.startswith(self.prefix + '/'):
+            return self.upper
+        return self.lower
+
+    def read_bytes(self, path: str) -> bytes:
+        return self._fs(path).read_bytes(path)
+
+    def read_text(self, path: str) -> str:
+        return self._fs(path).read_text(path)
+
+    def read_range(self, path: str, offset: int, length: int) -> bytes:
+        return self._fs(path).read_range(path, offset, length)
+
+    def write_bytes(self, path: str, data: bytes):
+        self._fs(path).write_bytes(path, data)
+
+    def write_text(self, path: str, text: str):
+        self._fs(path).write_text(path, text)
+
+    def append_bytes(self, path: str, data: bytes):
+        self._fs(path).append_bytes(path, data)
+
+    def remove(self, path: str):
+        self._fs(path).remove(path)
+
+    def replace(self, src_path: str, dst_path: str):
+        if self._fs(src_path) is not self._fs(dst_path):
+            raise Exception(f'cannot move {src_path} across filesystems')
+        self._fs(src_path).replace(src_path, dst_path)
+
+    def exists(self, path: str) -> bool:
+        return self._fs(path).exists(path)
+
+    def isfile(self, path: str) -> bool:
+        return self._fs(path).isfile(path)
+
+    def isdir(self, path: str) -> bool:
+        return self._fs(path).isdir(path)
+
+    def listdir(self, path: str) -> list[str]:
+        return self._fs(path).listdir(path)
+
+    def makedirs(self, path: str):
+        self._fs(path).makedirs(path)
+
+    def rmtree(self, path: str):
+        self._fs(path).rmtree(path)
+
+    def copy(self, src_path: str, dst_path: str):
+        src = self._fs(src_path)
+        dst = self._fs(dst_path)
+        if src is dst:
+            src.copy(src_path, dst_path)
+        else:
+            dst.write_bytes(dst_path, src.read_bytes(src_path))
+
+    def mtime(self, path: str) -> float:
+        return self._fs(path).mtime(path)
+
+    def size(self, path: str) -> int:
+        return self._fs(path).size(path)
@@ -0,0 +1,60 @@
+import posixpath
+
+
+def _is_internal(url: str) -> bool:
+    return url.startswith('/') and not url.startswith('//')
+
+
+def _parent(url: str) -> str:
+    return posixpath.dirname(url.rstrip('/')).rstrip('/') + '/'
+
+
+class PageHints():
+    # <link rel="preload"> for the first images of a page and
+    # <link rel="prefetch"> for the pages a reader is likely to open next,
+    # built from the images and links the page collected while rendering
+    def __init__(self, base_path: str = '/', max_preload: int = 1, max_prefetch: int = 3):
+        self.base_path = base_path
+        self.max_preload = max_preload
+        self.max_prefetch = max_prefetch
+        self.siblings: dict[str, list[str]] = {}
+
+    def set_pages(self, urls: list[str]):
+        self.siblings = {}
+        for url in sorted(urls):
+            self.siblings.setdefault(_parent(url), []).append(url)
+
+    def _href(self, url: str) -> str:
+        return self.base_path + url[1:]
+
+    def preload(self, images: list[str]) -> list[str]:
+        local = [src for src in images if _is_internal(src)]
+        return [f'<link rel="preload" as="image" href="{self._href(src)}" />' for src in local[:self.max_preload]]
+
+    def prefetch_candidates(self, url: str, links: list[str]) -> list[str]:
+        # pages linked from this one in document order, then the following
+        # sibling pages such as the next posts in the same blog directory
+        seen = {url.rstrip('/')}
+        candidates = []
+        for link in links:
+            link = link.split('#', 1)[0]
+            if not _is_internal(link) or link.rstrip('/') in seen:
+                continue
+            seen.add(link.rstrip('/'))
+            candidates.append(link)
+
+        siblings = self.siblings.get(_parent(url), [])
+        if url in siblings:
+            position = siblings.index(url)
+            siblings = siblings[position + 1:] + siblings[:position]
+        for sibling in siblings:
+            if sibling.rstrip('/') not in seen:
+                seen.add(sibling.rstrip('/'))
+                candidates.append(sibling)
+        return candidates[:self.max_prefetch]
+
+    def render(self, url: str, images: list[str], links: list[str]) -> str:
+        hints = self.preload(images)
+        for link in self.prefetch_candidates(url, links):
+            hints.append(f'<link rel="prefetch" href="{self._href(link)}" />')
+        return ''.join(hints)
@@ -49,9 +49,7 @@ class ParentNode(HTMLNode):
         if self.children is None:
             raise ValueError("parent node must have children")
 
-        children_html = ''
-        for child in self.children:
-            children_html += child.to_html()
+        children_html = ''.join(child.to_html() for child in self.children)
 
         props_html = ''
         if self.props is not None:
@@ -0,0 +1,148 @@
+import os
+import json
+import struct
+import hashlib
+from htmlnode import HTMLNode
+from transforms import Transform
+
+# start of frame markers that carry the image size
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _jpeg_size(read) -> tuple[int, int] | None:
+    offset = 2
+    while True:
+        header = read(offset, 4)
+        if len(header) < 4 or header[0] != 0xFF:
+            return None
+        marker = header[1]
+        if marker == 0xFF:
+            # fill byte before the marker
+            offset += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        length = struct.unpack('>H', header[2:4])[0]
+        if marker in JPEG_SOF:
+            frame = read(offset + 5, 4)
+            if len(frame) < 4:
+                return None
+            height, width = struct.unpack('>HH', frame)
+            return width, height
+        offset += 2 + length
+
+
+def image_size(read) -> tuple[int, int] | None:
+    # read(offset, length) returns bytes of the file, only the header is read
+    head = read(0, 30)
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and len(head) >= 24:
+        return struct.unpack('>II', head[16:24])
+    if head[:6] in (b'GIF87a', b'GIF89a') and len(head) >= 10:
+        return struct.unpack('<HH', head[6:10])
+    if head.startswith(b'\xff\xd8'):
+        return _jpeg_size(read)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+        chunk = head[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if chunk == b'VP8L':
+            bits = struct.unpack('<I', head[21:25])[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            width = int.from_bytes(head[24:27], 'little') + 1
+            height = int.from_bytes(head[27:30], 'little') + 1
+            return width, height
+    return None
+
+
+class ImageIndex():
+    # image sizes keyed by content hash, persisted between builds,
+    # files are only rehashed when their mtime changes
+    def __init__(self, fs, path: str = None):
+        self.fs = fs
+        self.path = path
+        self.files: dict[str, list] = {}
+        self.sizes: dict[str, list[int] | None] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, fs, path: str) -> 'ImageIndex':
+        index = cls(fs, path)
+        if fs.isfile(path):
+            try:
+                data = json.loads(fs.read_text(path))
+                files = data.get('files', {})
+                sizes = data.get('sizes', {})
+                if not isinstance(files, dict) or not isinstance(sizes, dict):
+                    raise ValueError(path)
+            except (OSError, ValueError, AttributeError):
+                # unreadable, every image is measured again
+                return index
+            index.files = files
+            index.sizes = sizes
+        return index
+
+    def save(self):
+        if self.path is None or not self.dirty:
+            return
+        self.fs.makedirs(os.path.dirname(self.path))
+        # swapped in whole, a build killed while saving leaves the old file
+        tmp_path = self.path + '.tmp'
+        self.fs.write_text(tmp_path, json.dumps({'files': self.files, 'sizes': self.sizes}))
+        self.fs.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def size(self, path: str) -> tuple[int, int] | None:
+        if not self.fs.isfile(path):
+            return None
+        mtime = self.fs.mtime(path)
+        entry = self.files.get(path)
+        if entry is not None and entry[0] == mtime:
+            digest = entry[1]
+        else:
+            digest = hashlib.sha1(self.fs.read_bytes(path)).hexdigest()
+            self.files[path] = [mtime, digest]
+            self.dirty = True
+
+        if digest not in self.sizes:
+            self.sizes[digest] = image_size(lambda offset, length: self.fs.read_range(path, offset, length))
+            self.dirty = True
+        size = self.sizes[digest]
+        return None if size is None else tuple(size)
+
+
+class ImageAttributes(Transform):
+    # register before UrlRewrite so src still maps onto static_dir
+    tags = ('img',)
+
+    def __init__(self, index: ImageIndex, static_dir: str, eager_first: bool = True):
+        self.index = index
+        self.static_dir = static_dir
+        self.eager_first = eager_first
+
+    def begin(self):
+        self._first = True
+
+    def _size(self, src: str) -> tuple[int, int] | None:
+        if not src.startswith('/') or src.startswith('//'):
+            return None
+        return self.index.size(os.path.join(self.static_dir, src.lstrip('/')))
+
+    def sizes(self, images: list[str]) -> tuple:
+        # what this transform read for a page's images, a cached page is
+        # stale once any of these changes
+        return tuple(self._size(src) for src in images)
+
+    def visit(self, node: HTMLNode):
+        if node.props is None:
+            node.props = {}
+        size = self._size(node.props.get('src') or '')
+        if size is not None:
+            node.props.setdefault('width', str(size[0]))
+            node.props.setdefault('height', str(size[1]))
+        if not (self._first and self.eager_first):
+            node.props.setdefault('loading', 'lazy')
+        node.props.setdefault('decoding', 'async')
+        self._first = False
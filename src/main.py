@@ -1,92 +1,141 @@
-import os
 import sys
-import shutil
-from textnode import TextNode, TextType
-from converter import extract_title,  markdown_to_html_node
-
-def cleanup(path: str):
-    print('cleanning pubic directory...')
-    if os.path.exists(path):
-        shutil.rmtree(path)
-        os.mkdir(path)
-    else:
-        os.mkdir(path)
-
-
-def copy_static_files(src_path: str, dst_path: str):
-    if not os.path.exists(src_path):
-        raise Exception("directory 'static' not exists")
-
-    # copy
-    print('starting copy files from static to public')
-    for item in os.listdir(src_path):
-        abs_path = os.path.join(src_path, item)
-        if os.path.isfile(abs_path):
-            print(f'copying {src_path}/{item} to {dst_path}/{item}')
-            shutil.copy(abs_path, dst_path)
-        elif os.path.isdir(abs_path):
-            shutil.copytree(abs_path, os.path.join(dst_path, item))
-
-def generate_page(base_path: str, from_path: str, template_path: str, dest_path: str):
-    print(f'Generating page from {from_path} to {dest_path} using {template_path}')
-
-    with open(from_path, 'r') as f:
-        markdown = f.read()
-
-    with open(template_path, 'r') as f:
-        template = f.read()
-
-    html_node = markdown_to_html_node(markdown)
-    title = extract_title(markdown)
-    content = html_node.to_html()
-
-    template = template.replace('{{ Title }}', title)
-    template = template.replace('{{ Content }}', content)
-
-    # replace url with base_path
-    if base_path != '/':
-        template = template.replace('href="/', f'href="{base_path}')
-        template = template.replace('src="/', f'src="{base_path}')
-
-    full_path, _ = dest_path.rsplit('/', maxsplit=1)
-    os.makedirs(full_path, exist_ok=True)
-
-    with open(dest_path, '+w') as f:
-        f.write(template)
-
-def _generate(base_path: str, src_dir: str, template_path: str, dst_dir: str):
-    for item in os.listdir(src_dir):
-        src_path = os.path.join(src_dir, item)
-        dst_path = os.path.join(dst_dir, item)
-
-        if os.path.isfile(src_path) and item.endswith('.md'):
-            name, _ = item.rsplit('.', maxsplit=1)
-            src_path = os.path.join(src_dir, f'{name}.md')
-            dst_path = os.path.join(dst_dir, f'{name}.html')
-            generate_page(base_path, src_path, template_path, dst_path)
-        elif os.path.isdir(src_path):
-            generate_pages_recursive(base_path, src_path, template_path, dst_path)
-
-def generate_pages_recursive(base_path: str, src_dir: str, template_path: str, dst_dir: str):
-    src = os.path.abspath(src_dir)
-    template = os.path.abspath(template_path)
-    dst = os.path.abspath(dst_dir) 
-    return _generate(base_path, src, template, dst)
+import argparse
+from builder import BuildConfig, BuildResult, build
+from budgets import Budget, format_report
+from memprofile import format_report as format_memory_report
+
+
+def add_build_options(parser: argparse.ArgumentParser):
+    # the options that change what a build writes, shared with daemon.py
+    parser.add_argument('--inline-css', type=int, metavar='BYTES', default=None,
+                        help='inline stylesheets up to BYTES into the page head and bundle the rest')
+    parser.add_argument('--image-attributes', action='store_true',
+                        help='add width, height, loading and decoding attributes to images')
+    parser.add_argument('--lazy-first-image', action='store_true',
+                        help='lazy load the first image of a page too')
+    parser.add_argument('--block-cache', type=int, metavar='BYTES', default=None,
+                        help='reuse rendered blocks between builds, keeping up to BYTES of html')
+    parser.add_argument('--preload', type=int, metavar='N', default=0,
+                        help='preload the first N images of each page')
+    parser.add_argument('--prefetch', type=int, metavar='N', default=0,
+                        help='prefetch up to N linked or sibling pages')
+    parser.add_argument('--service-worker', action='store_true',
+                        help='write sw.js and a precache manifest for offline use')
+    parser.add_argument('--pack', metavar='PATH',
+                        help='write the site into one pack file instead of docs/, see packserve.py')
+    parser.add_argument('--schedule', action='store_true',
+                        help='render pages edited since the last build first')
+    parser.add_argument('--priority', metavar='FILE',
+                        help='render the page urls listed in FILE next, implies --schedule')
+    parser.add_argument('--arena', action='store_true',
+                        help='parse pages into a flat array-backed tree, same output with less memory')
+    parser.add_argument('--budget-html', type=int, metavar='BYTES', help='max rendered html bytes per page')
+    parser.add_argument('--budget-images', type=int, metavar='BYTES', help='max image bytes referenced by a page')
+    parser.add_argument('--budget-ms', type=float, metavar='MS', help='max render time per page')
+
+
+# the BuildConfig keyword arguments build_options returns
+BUILD_OPTIONS = (
+    'inline_css_threshold',
+    'image_attributes',
+    'eager_first_image',
+    'block_cache_bytes',
+    'max_preload',
+    'max_prefetch',
+    'service_worker',
+    'pack_path',
+    'schedule',
+    'priority_path',
+    'budget',
+    'arena',
+)
+
+
+def build_options(args: argparse.Namespace) -> dict:
+    # BuildConfig keyword arguments for add_build_options, kept json safe so
+    # the daemon client can send them as they are
+    budget = None
+    if args.budget_html is not None or args.budget_images is not None or args.budget_ms is not None:
+        budget = [args.budget_html, args.budget_images, args.budget_ms]
+    return {
+        'inline_css_threshold': args.inline_css,
+        'image_attributes': args.image_attributes,
+        'eager_first_image': not args.lazy_first_image,
+        'block_cache_bytes': args.block_cache,
+        'max_preload': args.preload,
+        'max_prefetch': args.prefetch,
+        'service_worker': args.service_worker,
+        'pack_path': args.pack,
+        'schedule': args.schedule,
+        'priority_path': args.priority,
+        'budget': budget,
+        'arena': args.arena,
+    }
+
+
+def config_options(options: dict) -> dict:
+    # the reverse of build_options' json encoding
+    options = dict(options)
+    if options.get('budget') is not None:
+        options['budget'] = Budget(*options['budget'])
+    return options
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='build the site from content/ into docs/')
+    parser.add_argument('base_path', nargs='?', default='/')
+    add_build_options(parser)
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='report allocations per page and per stage with tracemalloc')
+    parser.add_argument('--background', action='store_true',
+                        help='report once the priority pages are published and finish the rest after')
+    parser.add_argument('--fail-on-budget', action='store_true', help='exit non-zero when a budget is exceeded')
+    return parser.parse_args(argv)
+
+
+def format_schedule_report(result: BuildResult) -> str:
+    # called before the tail of a background build is done
+    first = result.timings.get('first_page')
+    priority = result.timings.get('priority_pages')
+    parts = []
+    if first is not None:
+        parts.append(f'first page in {first * 1000:.1f}ms')
+    if priority is not None:
+        parts.append(f'{result.priority_count} priority pages in {priority * 1000:.1f}ms')
+    return ', '.join(parts) if len(parts) > 0 else 'no priority pages'
 
 
 def main():
-    basepath = '/'
-    if len(sys.argv) == 2:
-        basepath = sys.argv[1]
-
-    static_path = 'static'
-    src_path = 'content'
-    dst_path = 'docs'
-
-    cleanup(dst_path)
-    copy_static_files(static_path, dst_path)
-    generate_pages_recursive(basepath, src_path, 'template.html', dst_path)
+    args = parse_args(sys.argv[1:])
+
+    config = BuildConfig(
+        base_path=args.base_path,
+        static_dir='static',
+        content_dir='content',
+        output_dir='docs',
+        template_path='template.html',
+        profile_memory=args.profile_memory,
+        background=args.background,
+        log=print,
+        **config_options(build_options(args)),
+    )
+    result = build(config)
+    if config.schedule:
+        print(format_schedule_report(result))
+    result.wait()
+
+    print(f'built {len(result.pages)} pages in {result.timings["total"] * 1000:.1f}ms')
+    if result.memory is not None:
+        print(format_memory_report(result.memory))
+    if config.budget is not None:
+        print(format_report(result.budget_violations))
+    if not result.ok:
+        for path, message in result.errors:
+            print(f'{path}: {message}', file=sys.stderr)
+        sys.exit(1)
+    if args.fail_on_budget and len(result.budget_violations) > 0:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
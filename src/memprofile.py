@@ -0,0 +1,108 @@
+import tracemalloc
+from contextlib import contextmanager
+
+STAGES = ('read', 'markdown_to_html_node', 'to_html', 'template')
+
+
+class StageMemory():
+    def __init__(self, peak: int, retained: int):
+        self.peak = peak
+        self.retained = retained
+
+
+class PageMemory():
+    def __init__(self, path: str):
+        self.path = path
+        self.stages: dict[str, StageMemory] = {}
+        # both relative to the traced memory when the page started
+        self.peak = 0
+        self.retained = 0
+
+
+class MemoryProfiler():
+    # only built when profiling is asked for, the normal page path never
+    # touches tracemalloc
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.pages: list[PageMemory] = []
+        # (stage, file:line) -> bytes allocated and not freed within the stage
+        self.sites: dict[tuple[str, str], int] = {}
+        self._page: PageMemory = None
+        self._page_start = 0
+        self._started = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+
+    def stop(self):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def begin_page(self, path: str):
+        self._page = PageMemory(path)
+        self._page_start = tracemalloc.get_traced_memory()[0]
+
+    def end_page(self) -> PageMemory:
+        page = self._page
+        page.retained = tracemalloc.get_traced_memory()[0] - self._page_start
+        self.pages.append(page)
+        self._page = None
+        return page
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    @contextmanager
+    def stage(self, name: str):
+        before = self._snapshot()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        yield
+        current, peak = tracemalloc.get_traced_memory()
+        self._page.stages[name] = StageMemory(peak - start, current - start)
+        self._page.peak = max(self._page.peak, peak - self._page_start)
+
+        for stat in self._snapshot().compare_to(before, 'lineno'):
+            if stat.size_diff > 0:
+                frame = stat.traceback[0]
+                key = (name, f'{frame.filename}:{frame.lineno}')
+                self.sites[key] = self.sites.get(key, 0) + stat.size_diff
+
+    def stage_totals(self) -> dict[str, StageMemory]:
+        totals = {}
+        for name in STAGES:
+            stages = [page.stages[name] for page in self.pages if name in page.stages]
+            if stages:
+                totals[name] = StageMemory(max(s.peak for s in stages), sum(s.retained for s in stages))
+        return totals
+
+    def heaviest_pages(self) -> list[PageMemory]:
+        return sorted(self.pages, key=lambda page: page.peak, reverse=True)[:self.top]
+
+    def top_sites(self) -> list[tuple[tuple[str, str], int]]:
+        return sorted(self.sites.items(), key=lambda item: item[1], reverse=True)[:self.top]
+
+
+def _kib(size: int) -> str:
+    return f'{size / 1024:.1f} KiB'
+
+
+def format_report(profiler: MemoryProfiler) -> str:
+    lines = ['memory by stage (max peak, total retained):']
+    for name, stage in profiler.stage_totals().items():
+        lines.append(f'  {name:<22} {_kib(stage.peak):>12} {_kib(stage.retained):>12}')
+
+    lines.append('heaviest pages (peak, retained):')
+    for page in profiler.heaviest_pages():
+        lines.append(f'  {page.path}  {_kib(page.peak)}  {_kib(page.retained)}')
+        for name, stage in page.stages.items():
+            lines.append(f'    {name:<22} {_kib(stage.peak):>12} {_kib(stage.retained):>12}')
+
+    lines.append('top allocation sites:')
+    for (name, site), size in profiler.top_sites():
+        lines.append(f'  {_kib(size):>12}  {name:<22} {site}')
+    return '\n'.join(lines)
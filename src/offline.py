@@ -0,0 +1,106 @@
+import os
+import json
+import hashlib
+
+MANIFEST_NAME = 'precache-manifest.json'
+WORKER_NAME = 'sw.js'
+
+# the manifest is inlined so any change to it changes the worker bytes,
+# which is what makes browsers install the new version. entries whose
+# revision did not change stay in the cache and are not fetched again.
+WORKER_SOURCE = '''const MANIFEST = %(manifest)s;
+const CACHE = 'ssg-precache';
+const REVISION = '__ssg_revision';
+
+function revisioned(entry) {
+  const url = new URL(entry.url, self.location);
+  url.searchParams.set(REVISION, entry.revision);
+  return url.href;
+}
+
+const wanted = new Map(MANIFEST.map(entry => [new URL(entry.url, self.location).href, revisioned(entry)]));
+
+self.addEventListener('install', event => {
+  event.waitUntil(caches.open(CACHE).then(async cache => {
+    for (const entry of MANIFEST) {
+      const key = revisioned(entry);
+      if (!(await cache.match(key))) {
+        const response = await fetch(entry.url, {cache: 'no-cache'});
+        if (!response.ok) {
+          throw new Error(`precache ${entry.url}: ${response.status}`);
+        }
+        await cache.put(key, response);
+      }
+    }
+  }).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+  const keep = new Set(wanted.values());
+  event.waitUntil(caches.open(CACHE).then(async cache => {
+    for (const request of await cache.keys()) {
+      if (!keep.has(request.url)) {
+        await cache.delete(request);
+      }
+    }
+  }).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+  if (event.request.method !== 'GET') {
+    return;
+  }
+  const url = new URL(event.request.url);
+  url.hash = '';
+  url.search = '';
+  let key = wanted.get(url.href);
+  if (key === undefined && !url.pathname.endsWith('/')) {
+    key = wanted.get(url.href + '/');
+  }
+  if (key !== undefined) {
+    event.respondWith(caches.open(CACHE)
+      .then(cache => cache.match(key))
+      .then(response => response || fetch(event.request)));
+  }
+});
+'''
+
+
+def revision(data: bytes) -> str:
+    # content hash, so an unchanged file keeps its revision between builds
+    return hashlib.sha1(data).hexdigest()[:10]
+
+
+def file_url(output_dir: str, path: str, base_path: str = '/') -> str:
+    url = os.path.relpath(path, output_dir).replace(os.sep, '/')
+    if url == 'index.html':
+        url = ''
+    elif url.endswith('/index.html'):
+        url = url[:-len('index.html')]
+    return base_path + url
+
+
+def precache_manifest(paths: list[str], output_dir: str, base_path: str, fs) -> list[dict[str, str]]:
+    # paths are the pages and static files the build wrote under output_dir
+    entries = {}
+    for path in paths:
+        url = file_url(output_dir, path, base_path)
+        entries[url] = revision(fs.read_bytes(path))
+    return [{'url': url, 'revision': entries[url]} for url in sorted(entries)]
+
+
+def registration_script(base_path: str = '/') -> str:
+    worker = base_path + WORKER_NAME
+    return (
+        "<script>if ('serviceWorker' in navigator) { window.addEventListener('load', () => "
+        f"navigator.serviceWorker.register('{worker}', {{ scope: '{base_path}' }})); }}</script>"
+    )
+
+
+def write_service_worker(paths: list[str], output_dir: str, base_path: str, fs) -> list[str]:
+    manifest = precache_manifest(paths, output_dir, base_path, fs)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    worker_path = os.path.join(output_dir, WORKER_NAME)
+    fs.write_text(manifest_path, json.dumps(manifest, indent=2) + '\n')
+    fs.write_text(worker_path, WORKER_SOURCE % {'manifest': json.dumps(manifest)})
+    return [manifest_path, worker_path]
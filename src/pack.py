@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+import mimetypes
+
+
+def content_type(path: str) -> str:
+    guessed, encoding = mimetypes.guess_type(path)
+    if guessed is None or encoding is not None:
+        return 'application/octet-stream'
+    if guessed.startswith('text/') or guessed in ('application/javascript', 'application/json'):
+        return f'{guessed}; charset=utf-8'
+    return guessed
+
+
+def index_path(pack_path: str) -> str:
+    return pack_path + '.json'
+
+
+class PackEntry():
+    def __init__(self, offset: int, length: int, content_type: str, digest: str):
+        self.offset = offset
+        self.length = length
+        self.content_type = content_type
+        self.digest = digest
+
+    def __eq__(self, value):
+        return vars(self) == vars(value)
+
+    def __repr__(self):
+        return f'PackEntry({self.offset}, {self.length}, {self.content_type!r}, {self.digest!r})'
+
+
+class Pack():
+    # every output file in one append-only blob, the index maps the url
+    # path of a file ('/blog/index.html') to where its bytes live. changed
+    # files are appended and the old bytes left in place until compaction,
+    # so a server that mapped the pack earlier keeps serving valid bytes.
+    def __init__(self, fs, path: str):
+        self.fs = fs
+        self.path = path
+        self.entries: dict[str, PackEntry] = {}
+        self.size = 0
+        # bytes written by the last update
+        self.appended = 0
+
+    @classmethod
+    def load(cls, fs, path: str) -> 'Pack':
+        pack = cls(fs, path)
+        if fs.isfile(path) and fs.isfile(index_path(path)):
+            data = json.loads(fs.read_text(index_path(path)))
+            pack.size = data['size']
+            for url, entry in data['entries'].items():
+                pack.entries[url] = PackEntry(*entry)
+            if fs.size(path) < pack.size:
+                # truncated, nothing in the index can be trusted
+                pack.entries = {}
+            # a larger pack is an append without its index, the tail is
+            # unreachable and dropped by the next compaction
+            pack.size = fs.size(path)
+        return pack
+
+    def save(self):
+        entries = {url: [e.offset, e.length, e.content_type, e.digest] for url, e in sorted(self.entries.items())}
+        data = {'size': self.size, 'entries': entries}
+        # swapped in whole, a server reloading the index never sees half of it
+        tmp_path = index_path(self.path) + '.tmp'
+        self.fs.write_text(tmp_path, json.dumps(data, separators=(',', ':')))
+        self.fs.replace(tmp_path, index_path(self.path))
+
+    def live_bytes(self) -> int:
+        return sum(entry.length for entry in self.entries.values())
+
+    def read(self, url: str) -> bytes:
+        entry = self.entries[url]
+        return self.fs.read_range(self.path, entry.offset, entry.length)
+
+    def update(self, files: dict[str, bytes], keep: bool = False):
+        # files is the complete output of a build, url path -> bytes. with
+        # keep, files is only part of it and the other entries stay.
+        self.appended = 0
+        chunks = []
+        entries = dict(self.entries) if keep else {}
+        for url, data in files.items():
+            digest = hashlib.sha1(data).hexdigest()[:16]
+            entry = self.entries.get(url)
+            if entry is None or entry.digest != digest:
+                entry = PackEntry(self.size + self.appended, len(data), content_type(url), digest)
+                chunks.append(data)
+                self.appended += len(data)
+            entries[url] = entry
+        self.entries = entries
+        if len(chunks) > 0:
+            # one write for the whole build
+            self.fs.append_bytes(self.path, b''.join(chunks))
+            self.size += self.appended
+
+    def compact(self):
+        # rewrite only the live entries into a fresh file and swap it in
+        tmp_path = self.path + '.tmp'
+        data = memoryview(self.fs.read_bytes(self.path))
+        chunks = []
+        entries = {}
+        offset = 0
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1].offset):
+            chunks.append(data[entry.offset:entry.offset + entry.length])
+            entries[url] = PackEntry(offset, entry.length, entry.content_type, entry.digest)
+            offset += entry.length
+        self.fs.write_bytes(tmp_path, b''.join(chunks))
+        self.fs.replace(tmp_path, self.path)
+        self.entries = entries
+        self.size = offset
+
+
+def pack_output(fs, output_dir: str, paths: list[str], out_fs, pack_path: str, compact_ratio: float = 0.5, partial: bool = False) -> Pack:
+    # paths are the files the build wrote under output_dir on fs, the pack
+    # and its index are written to out_fs. compacts once more than
+    # compact_ratio of the pack is unreachable. partial publishes the
+    # files written so far and keeps every other entry as it was.
+    files = {}
+    for path in paths:
+        url = '/' + os.path.relpath(path, output_dir).replace(os.sep, '/')
+        files[url] = fs.read_bytes(path)
+
+    pack = Pack.load(out_fs, pack_path)
+    pack.update(files, keep=partial)
+    if not partial and pack.size > 0 and pack.size - pack.live_bytes() > pack.size * compact_ratio:
+        pack.compact()
+    pack.save()
+    return pack
@@ -0,0 +1,192 @@
+import os
+import json
+import mmap
+import time
+import argparse
+import threading
+from urllib.parse import unquote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pack import PackEntry, index_path
+
+
+class _Mapping():
+    # one open pack file and its read only map, closed when the last
+    # request holding it is done
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), size, access=mmap.ACCESS_READ) if size > 0 else None
+
+    def close(self):
+        if self.data is not None:
+            self.data.close()
+        self.file.close()
+
+    def __del__(self):
+        self.close()
+
+
+class PackSite():
+    # the pack mapped read only plus its index. reload() maps the current
+    # pack again when the index changed, requests that already hold the
+    # previous map keep reading from it.
+    def __init__(self, path: str, base_path: str = '/'):
+        self.path = path
+        self.base_path = base_path
+        self.entries: dict[str, PackEntry] = {}
+        self.mapping: _Mapping = None
+        self.index_mtime = None
+        self.lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        mtime = os.stat(index_path(self.path)).st_mtime_ns
+        if mtime == self.index_mtime:
+            return False
+        with open(index_path(self.path)) as f:
+            data = json.load(f)
+        mapping = _Mapping(self.path)
+        with self.lock:
+            self.entries = {url: PackEntry(*entry) for url, entry in data['entries'].items()}
+            self.mapping = mapping
+            self.index_mtime = mtime
+        return True
+
+    def snapshot(self) -> tuple[dict[str, PackEntry], _Mapping]:
+        with self.lock:
+            return self.entries, self.mapping
+
+    def close(self):
+        with self.lock:
+            self.entries = {}
+            self.mapping = None
+
+    def resolve(self, entries: dict[str, PackEntry], path: str) -> tuple[str, str]:
+        # (url in the pack, None) or (None, redirect location) or (None, None)
+        if not path.startswith(self.base_path):
+            if path + '/' == self.base_path:
+                return None, self.base_path
+            return None, None
+        url = '/' + path[len(self.base_path):]
+        if url.endswith('/'):
+            url += 'index.html'
+        if url in entries:
+            return url, None
+        if url + '/index.html' in entries:
+            return None, path + '/'
+        return None, None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def _respond(self, body: bool):
+        site = self.server.site
+        entries, mapping = site.snapshot()
+        path = unquote(urlsplit(self.path).path)
+        url, location = site.resolve(entries, path)
+
+        if location is not None:
+            self.send_response(301)
+            self.send_header('Location', location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if url is None:
+            message = b'not found\n'
+            self.send_response(404)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(message)))
+            self.end_headers()
+            if body:
+                self.wfile.write(message)
+            return
+
+        entry = entries[url]
+        etag = f'"{entry.digest}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', entry.content_type)
+        self.send_header('Content-Length', str(entry.length))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        if body and entry.length > 0:
+            self._send_body(entry, mapping)
+
+    def _send_body(self, entry: PackEntry, mapping: _Mapping):
+        self.wfile.flush()
+        if self.server.use_sendfile:
+            # straight from the page cache to the socket
+            offset = entry.offset
+            end = entry.offset + entry.length
+            while offset < end:
+                sent = os.sendfile(self.connection.fileno(), mapping.file.fileno(), offset, end - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        else:
+            self.wfile.write(memoryview(mapping.data)[entry.offset:entry.offset + entry.length])
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PackServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], pack_path: str, base_path: str = '/', reload_interval: float = 1.0, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.site = PackSite(pack_path, base_path)
+        self.use_sendfile = hasattr(os, 'sendfile')
+        self.reload_interval = reload_interval
+        self.verbose = verbose
+        self._checked = time.monotonic()
+
+    def service_actions(self):
+        # picks up rebuilt packs without a stat per request
+        now = time.monotonic()
+        if self.reload_interval is not None and now - self._checked >= self.reload_interval:
+            self._checked = now
+            try:
+                self.site.reload()
+            except (OSError, ValueError):
+                pass
+
+    def server_close(self):
+        super().server_close()
+        self.site.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='serve a site pack written by main.py --pack')
+    parser.add_argument('pack', help='pack file, the index is read from PACK.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--base-path', default='/')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = PackServer((args.host, args.port), args.pack, args.base_path, verbose=args.verbose)
+    print(f'serving {args.pack} on http://{args.host}:{args.port}{args.base_path}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import json
+
+
+def load_priority_list(fs, path: str, base_path: str = '/') -> list[str]:
+    # one page url per line, most important first, as exported from traffic
+    # stats. blank lines and # comments are skipped, urls may carry the
+    # base path.
+    urls = []
+    for line in fs.read_text(path).splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line == '':
+            continue
+        if base_path != '/' and line.startswith(base_path):
+            line = '/' + line[len(base_path):]
+        urls.append(line)
+    return urls
+
+
+def _url_key(url: str) -> str:
+    url = url.split('?', 1)[0]
+    if url.endswith('/index.html'):
+        url = url[:-len('index.html')]
+    return url.rstrip('/') or '/'
+
+
+class Scheduler():
+    # orders page jobs as: sources modified since the last build, newest
+    # first, then pages named in the priority list in its order, then the
+    # rest in discovery order. the first two groups are the priority set.
+    def __init__(self, fs, state_path: str, priority: list[str] = None):
+        self.fs = fs
+        self.state_path = state_path
+        self.priority = priority if priority is not None else []
+        # source path -> mtime at the previous build, None before the first
+        self.seen: dict[str, float] = None
+        self.mtimes: dict[str, float] = {}
+
+    @classmethod
+    def load(cls, fs, state_path: str, priority: list[str] = None) -> 'Scheduler':
+        scheduler = cls(fs, state_path, priority)
+        if fs.isfile(state_path):
+            try:
+                seen = json.loads(fs.read_text(state_path))
+            except (OSError, ValueError):
+                # unreadable, ordered like a first build
+                return scheduler
+            if isinstance(seen, dict):
+                scheduler.seen = seen
+        return scheduler
+
+    def save(self):
+        self.fs.makedirs(os.path.dirname(self.state_path))
+        # swapped in whole, a build killed while saving leaves the old file
+        tmp_path = self.state_path + '.tmp'
+        self.fs.write_text(tmp_path, json.dumps(self.mtimes))
+        self.fs.replace(tmp_path, self.state_path)
+
+    def order(self, jobs: list[tuple[str, str]], urls: list[str]) -> tuple[list[tuple[str, str]], int]:
+        # urls[i] is the page url of jobs[i]. returns the reordered jobs and
+        # the size of the priority set at their front.
+        self.mtimes = {src_path: self.fs.mtime(src_path) for src_path, _ in jobs}
+        recent = []
+        if self.seen is not None:
+            recent = [i for i, (src_path, _) in enumerate(jobs) if self.seen.get(src_path) != self.mtimes[src_path]]
+            recent.sort(key=lambda i: self.mtimes[jobs[i][0]], reverse=True)
+
+        position = {_url_key(url): i for i, url in enumerate(urls)}
+        first = recent
+        chosen = set(recent)
+        for url in self.priority:
+            i = position.get(_url_key(url))
+            if i is not None and i not in chosen:
+                first.append(i)
+                chosen.add(i)
+
+        rest = [i for i in range(len(jobs)) if i not in chosen]
+        return [jobs[i] for i in first + rest], len(first)
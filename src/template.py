@@ -0,0 +1,192 @@
+import os
+import re
+from collections import OrderedDict
+from converter import markdown_to_html_node
+from transforms import UrlRewrite, apply_transforms
+
+TAG_PATTERN = re.compile(r'\{\{(>?)\s*([\w.-]+)\s*\}\}')
+
+LITERAL = 0
+VARIABLE = 1
+PARTIAL = 2
+
+# page bodies are unique per page, caching partials that read them only
+# keeps a second copy of every page
+UNCACHED_VARIABLES = ('Content',)
+# rendered variants kept per partial, least recently used dropped first
+PARTIAL_CACHE_SIZE = 256
+
+
+class RenderCache():
+    def __init__(self, max_entries: int = PARTIAL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def get(self, key) -> bytes | None:
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+        return html
+
+    def put(self, key, html: bytes):
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def rewrite_base_path(html: str, base_path: str) -> str:
+    if base_path == '/':
+        return html
+    html = html.replace('href="/', f'href="{base_path}')
+    html = html.replace('src="/', f'src="{base_path}')
+    return html
+
+
+class Partial():
+    def __init__(self, name: str, plan: list, deps: tuple[str, ...]):
+        self.name = name
+        self.plan = plan
+        self.deps = deps
+        self.cache = RenderCache()
+        self.cached = not any(dep in UNCACHED_VARIABLES for dep in deps)
+
+    def render(self, context: dict[str, str]) -> bytes:
+        if not self.cached:
+            return _render_plan(self.plan, context)
+        key = tuple(context.get(dep) for dep in self.deps)
+        html = self.cache.get(key)
+        if html is None:
+            html = _render_plan(self.plan, context)
+            self.cache.put(key, html)
+        return html
+
+
+class ComputedPartial():
+    # a partial produced by a function of the page variables in deps,
+    # cached by key(context) which may be coarser than the deps
+    def __init__(self, name: str, deps: tuple[str, ...], key, render):
+        self.name = name
+        self.deps = deps
+        self._key = key
+        self._render = render
+        self.cache = RenderCache()
+
+    def render(self, context: dict[str, str]) -> bytes:
+        key = self._key(context)
+        html = self.cache.get(key)
+        if html is None:
+            html = self._render(key).encode()
+            self.cache.put(key, html)
+        return html
+
+
+def breadcrumbs_partial(base_path: str = '/') -> ComputedPartial:
+    def key(context: dict[str, str]) -> str:
+        url = context.get('Url') or '/'
+        parent = url.rstrip('/').rsplit('/', maxsplit=1)[0]
+        return parent + '/'
+
+    def render(parent: str) -> str:
+        items = [f'<a href="{base_path}">Home</a>']
+        path = base_path
+        for part in parent.strip('/').split('/'):
+            if part == '':
+                continue
+            path = f'{path}{part}/'
+            items.append(f'<a href="{path}">{part}</a>')
+        return f'<nav class="breadcrumbs">{" / ".join(items)}</nav>'
+
+    return ComputedPartial('breadcrumbs', ('Url',), key, render)
+
+
+def _render_plan(plan: list, context: dict[str, str]) -> bytes:
+    parts = []
+    for kind, payload in plan:
+        if kind == LITERAL:
+            parts.append(payload)
+        elif kind == VARIABLE:
+            name, raw = payload
+            value = context.get(name)
+            parts.append(raw if value is None else value.encode())
+        else:
+            parts.append(payload.render(context))
+    return b''.join(parts)
+
+
+class Template():
+    def __init__(self, text: str, base_path: str = '/', fs = None, partials_dir: str = None, computed: list[ComputedPartial] = None):
+        self.base_path = base_path
+        self.fs = fs
+        self.partials_dir = partials_dir
+        self.partials: dict[str, Partial | ComputedPartial] = {}
+        for partial in computed if computed is not None else [breadcrumbs_partial(base_path)]:
+            self.partials[partial.name] = partial
+        self.plan, deps = self._compile(rewrite_base_path(text, base_path), ())
+        self.variables = set(deps)
+
+    def render(self, context: dict[str, str]) -> bytes:
+        return _render_plan(self.plan, context)
+
+    def _compile(self, text: str, including: tuple[str, ...]) -> tuple[list, tuple[str, ...]]:
+        plan = []
+        deps = []
+        literal = []
+        pos = 0
+        for match in TAG_PATTERN.finditer(text):
+            literal.append(text[pos:match.start()].encode())
+            pos = match.end()
+            is_partial, name = match.groups()
+            if not is_partial:
+                if name not in deps:
+                    deps.append(name)
+                plan.append((LITERAL, b''.join(literal)))
+                literal = []
+                plan.append((VARIABLE, (name, match.group(0).encode())))
+                continue
+
+            partial = self._load_partial(name, including)
+            if isinstance(partial, Partial) and len(partial.deps) == 0:
+                # page independent, rendered once and inlined as bytes
+                literal.append(partial.render({}))
+                continue
+            for dep in partial.deps:
+                if dep not in deps:
+                    deps.append(dep)
+            plan.append((LITERAL, b''.join(literal)))
+            literal = []
+            plan.append((PARTIAL, partial))
+        literal.append(text[pos:].encode())
+        plan.append((LITERAL, b''.join(literal)))
+        return [step for step in plan if step != (LITERAL, b'')], tuple(deps)
+
+    def _load_partial(self, name: str, including: tuple[str, ...]):
+        if name in including:
+            raise Exception(f'recursive partial: {" -> ".join(including + (name,))}')
+        if name in self.partials:
+            return self.partials[name]
+        if self.fs is None or self.partials_dir is None:
+            raise Exception(f'unknown partial: {name}')
+
+        html_path = os.path.join(self.partials_dir, f'{name}.html')
+        md_path = os.path.join(self.partials_dir, f'{name}.md')
+        if self.fs.isfile(html_path):
+            text = rewrite_base_path(self.fs.read_text(html_path), self.base_path)
+            plan, deps = self._compile(text, including + (name,))
+        elif self.fs.isfile(md_path):
+            node = markdown_to_html_node(self.fs.read_text(md_path))
+            if self.base_path != '/':
+                apply_transforms(node, [UrlRewrite(self.base_path)])
+            plan, deps = [(LITERAL, node.to_html().encode())], ()
+        else:
+            raise Exception(f'unknown partial: {name}')
+
+        partial = Partial(name, plan, deps)
+        self.partials[name] = partial
+        return partial
@@ -0,0 +1,119 @@
+import os
+import sys
+import unittest
+
+from arena import DocumentArena, ArenaNode
+from converter import markdown_to_arena, markdown_to_html_node
+from transforms import HeadingAnchors, UrlRewrite, apply_transforms
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content")
+
+MARKDOWN = '''
+# Welcome
+
+This is a paragraph with **bold**, _italic_, `code` and a [link](/blog).
+
+![image](/images/a.png)
+
+> a quote
+> on two lines
+
+```
+some code
+```
+
+- list item 1
+- list item 2
+
+1. One
+2. Two
+'''
+
+
+class TestDocumentArena(unittest.TestCase):
+    def test_build_and_serialize(self):
+        arena = DocumentArena()
+        arena.open("div", {"class": "container"})
+        arena.leaf("p", "Paragraph 1")
+        arena.open("span")
+        arena.leaf("b", "Nested bold")
+        arena.leaf(None, "Nested normal")
+        arena.close()
+        arena.open("ul")
+        arena.close()
+        arena.close()
+        self.assertEqual(
+            arena.to_html(),
+            '<div class="container"><p>Paragraph 1</p><span><b>Nested bold</b>Nested normal</span><ul></ul></div>',
+        )
+        self.assertEqual(arena.to_html(2), "<span><b>Nested bold</b>Nested normal</span>")
+        self.assertEqual(arena.children(0), [1, 2, 5])
+        self.assertEqual(arena.buffer, "Paragraph 1Nested boldNested normal")
+
+    def test_invalid_nodes(self):
+        arena = DocumentArena()
+        with self.assertRaises(ValueError):
+            arena.open(None)
+        with self.assertRaises(ValueError):
+            arena.leaf("p", None)
+
+    def test_matches_html_node(self):
+        arena = markdown_to_arena(MARKDOWN)
+        self.assertEqual(arena.to_html(), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_matches_html_node_for_content(self):
+        compared = 0
+        for root, _, files in os.walk(CONTENT_DIR):
+            for name in files:
+                if not name.endswith(".md"):
+                    continue
+                with open(os.path.join(root, name)) as f:
+                    markdown = f.read()
+                self.assertEqual(markdown_to_arena(markdown).to_html(), markdown_to_html_node(markdown).to_html())
+                compared += 1
+        self.assertGreater(compared, 0)
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 10
+        arena = DocumentArena()
+        for _ in range(depth):
+            arena.open("div")
+        arena.leaf(None, "x")
+        for _ in range(depth):
+            arena.close()
+        html = arena.to_html()
+        self.assertEqual(html, "<div>" * depth + "x" + "</div>" * depth)
+
+    def test_view(self):
+        arena = markdown_to_arena("# Title\n\n[a](/a) and ![b](/b.png)")
+        root = arena.node()
+        self.assertIsInstance(root, ArenaNode)
+        self.assertEqual(root.tag, "div")
+        self.assertIsNone(root.value)
+        heading, paragraph = root.children
+        self.assertEqual(heading.tag, "h1")
+        self.assertEqual(heading.children[0].value, "Title")
+        self.assertIsNone(heading.children[0].children)
+        self.assertEqual(paragraph.children[0].props, {"href": "/a"})
+
+    def test_transforms_over_view(self):
+        arena = markdown_to_arena("# Title\n\n[a](/a) and ![b](/b.png)")
+        apply_transforms(arena.node(), [HeadingAnchors(), UrlRewrite("/ssg/")])
+        self.assertEqual(
+            arena.to_html(),
+            '<div><h1 id="title"><span>Title</span></h1>'
+            '<p><a href="/ssg/a">a</a><span> and </span><img src="/ssg/b.png" alt="b"></img></p></div>',
+        )
+
+    def test_compact_storage(self):
+        arena = markdown_to_arena(MARKDOWN * 100)
+        per_node = sum(a.itemsize for a in (
+            arena.tags, arena.kinds, arena.parents, arena.first_child,
+            arena.next_sibling, arena.text_start, arena.text_len,
+        ))
+        self.assertLessEqual(per_node, 24)
+        self.assertEqual(len(arena.tag_names), len(set(arena.tag_names)))
+
+
+if __name__ == "__main__":
+    unittest.main()
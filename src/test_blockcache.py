@@ -0,0 +1,143 @@
+import unittest
+from unittest import mock
+
+from fs import MemoryFS
+from converter import BlockType, markdown_to_html_node
+from transforms import CollectResources, ExternalLinks, HeadingAnchors, TableOfContents, UrlRewrite, apply_transforms
+from blockcache import BlockCache, is_cacheable, markdown_to_cached_node
+
+
+MARKDOWN = '''# Title
+
+Intro with a [link](/a) and [external](https://example.com).
+
+## Section
+
+![image](/images/a.png)
+
+- one
+- [two](/b)
+
+```
+code
+```
+
+> quote'''
+
+
+def transforms():
+    return [HeadingAnchors(), TableOfContents(), ExternalLinks(), UrlRewrite("/ssg/")]
+
+
+def render_uncached(markdown):
+    node = markdown_to_html_node(markdown)
+    resources = CollectResources()
+    apply_transforms(node, [resources] + transforms())
+    return node.to_html(), resources
+
+
+def render_cached(markdown, cache):
+    resources = CollectResources()
+    node = markdown_to_cached_node(markdown, transforms(), cache, resources)
+    return node.to_html(), resources
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_is_cacheable(self):
+        self.assertTrue(is_cacheable("text", BlockType.PARAGRAPH))
+        self.assertFalse(is_cacheable("# Title", BlockType.HEADING))
+        self.assertFalse(is_cacheable("see ![a](/a.png)", BlockType.PARAGRAPH))
+
+    def test_same_output_as_uncached(self):
+        cache = BlockCache()
+        expected, expected_resources = render_uncached(MARKDOWN)
+        for _ in range(2):
+            html, resources = render_cached(MARKDOWN, cache)
+            self.assertEqual(html, expected)
+            self.assertEqual(resources.images, expected_resources.images)
+            self.assertEqual(resources.links, expected_resources.links)
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(cache.hits, 4)
+
+    def test_only_changed_blocks_are_rendered(self):
+        cache = BlockCache()
+        blocks = [f"paragraph {i} with **bold**" for i in range(100)]
+        render_cached("\n\n".join(blocks), cache)
+        self.assertEqual(cache.misses, 100)
+
+        blocks[50] = "changed paragraph"
+        html, _ = render_cached("\n\n".join(blocks), cache)
+        self.assertEqual(cache.misses, 101)
+        self.assertEqual(cache.hits, 99)
+        self.assertEqual(html, render_uncached("\n\n".join(blocks))[0])
+
+    def test_transforms_are_part_of_the_key(self):
+        cache = BlockCache()
+        render_cached("[a](/a)", cache)
+        resources = CollectResources()
+        node = markdown_to_cached_node("[a](/a)", [UrlRewrite("/other/")], cache, resources)
+        self.assertEqual(node.to_html(), '<div><p><a href="/other/a">a</a></p></div>')
+
+    def test_version_is_part_of_the_key(self):
+        cache = BlockCache()
+        render_cached(MARKDOWN, cache)
+        with mock.patch("blockcache.BLOCK_CACHE_VERSION", -1):
+            render_cached(MARKDOWN, cache)
+        self.assertEqual(cache.hits, 0)
+
+    def test_lru_eviction(self):
+        cache = BlockCache(max_bytes=10)
+        cache.put("a", "aaaa", [])
+        cache.put("b", "bbbb", [])
+        cache.get("a")
+        cache.put("c", "cccc", [])
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.size, 8)
+
+    def test_persistence(self):
+        fs = MemoryFS()
+        cache = BlockCache.load(fs, ".ssg-cache/blocks.json")
+        render_cached(MARKDOWN, cache)
+        cache.save()
+
+        loaded = BlockCache.load(fs, ".ssg-cache/blocks.json")
+        self.assertEqual(loaded.entries, cache.entries)
+        self.assertEqual(loaded.size, cache.size)
+        self.assertFalse(loaded.dirty)
+        render_cached(MARKDOWN, loaded)
+        self.assertEqual(loaded.misses, 0)
+
+    def test_hits_persist_recency(self):
+        fs = MemoryFS()
+        cache = BlockCache(max_bytes=10, fs=fs, path=".ssg-cache/blocks.json")
+        cache.put("a", "aaaa", [])
+        cache.put("b", "bbbb", [])
+        cache.save()
+
+        loaded = BlockCache.load(fs, ".ssg-cache/blocks.json", max_bytes=10)
+        loaded.get("b")
+        self.assertFalse(loaded.dirty)
+        loaded.get("a")
+        self.assertTrue(loaded.dirty)
+        loaded.save()
+
+        loaded = BlockCache.load(fs, ".ssg-cache/blocks.json", max_bytes=10)
+        loaded.put("c", "cccc", [])
+        self.assertEqual(list(loaded.entries), ["a", "c"])
+
+    def test_damaged_file_is_dropped(self):
+        fs = MemoryFS()
+        cache = BlockCache.load(fs, ".ssg-cache/blocks.json")
+        render_cached(MARKDOWN, cache)
+        cache.save()
+        self.assertFalse(fs.exists(".ssg-cache/blocks.json.tmp"))
+
+        data = fs.read_text(".ssg-cache/blocks.json")
+        for damaged in (data[:len(data) // 2], "{}", "[[1, 2]]"):
+            fs.write_text(".ssg-cache/blocks.json", damaged)
+            loaded = BlockCache.load(fs, ".ssg-cache/blocks.json")
+            self.assertEqual((len(loaded.entries), loaded.size), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
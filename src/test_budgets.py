@@ -0,0 +1,46 @@
+import unittest
+
+from fs import MemoryFS
+from builder import BuildConfig, PageResult, build
+from budgets import Budget, BudgetViolation, check_page, format_report, page_image_bytes
+
+
+class TestBudgets(unittest.TestCase):
+    def test_page_image_bytes(self):
+        fs = MemoryFS({"static/images/a.png": b"x" * 100, "static/images/b.png": b"x" * 50})
+        images = ["/images/a.png", "/images/a.png", "/images/b.png", "https://example.com/c.png", "/missing.png"]
+        self.assertEqual(page_image_bytes(images, fs, "static"), 150)
+
+    def test_check_page(self):
+        fs = MemoryFS({"static/big.png": b"x" * 1000})
+        page = PageResult("content/index.md", "docs/index.html", "Home", 5000, 0.25, ["/big.png"])
+        self.assertEqual(check_page(page, Budget(), fs, "static"), [])
+        self.assertEqual(
+            check_page(page, Budget(max_html_bytes=4000, max_image_bytes=999, max_render_ms=100), fs, "static"),
+            [
+                BudgetViolation("docs/index.html", "html bytes", 5000, 4000),
+                BudgetViolation("docs/index.html", "image bytes", 1000, 999),
+                BudgetViolation("docs/index.html", "render ms", 250, 100),
+            ],
+        )
+        self.assertEqual(check_page(page, Budget(5000, 1000, 250), fs, "static"), [])
+
+    def test_format_report(self):
+        self.assertEqual(format_report([]), "all pages within budget")
+        report = format_report([BudgetViolation("docs/index.html", "html bytes", 5000, 4000)])
+        self.assertEqual(report, "1 budget violations:\n  docs/index.html: html bytes 5000 exceeds budget 4000")
+
+    def test_build_checks_budgets(self):
+        fs = MemoryFS({
+            "template.html": "{{ Content }}",
+            "static/hero.png": b"x" * 2048,
+            "content/index.md": "# Home\n\n![hero](/hero.png)",
+            "content/small.md": "# Small",
+        })
+        result = build(BuildConfig(base_path="/ssg/", budget=Budget(max_image_bytes=1024), fs=fs))
+        self.assertTrue(result.ok)
+        self.assertEqual(result.budget_violations, [BudgetViolation("docs/index.html", "image bytes", 2048, 1024)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+from unittest import mock
+
+from builder import BuildCache, BuildConfig, build, render_page
+from transforms import HeadingAnchors, TableOfContents
+from fixtures import TEMPLATE, make_site
+
+
+class TestBuilder(unittest.TestCase):
+    def test_render_page(self):
+        title, html = render_page("/", "# Hello\n\nworld", TEMPLATE)
+        self.assertEqual(title, "Hello")
+        self.assertIn("<title>Hello</title>", html)
+        self.assertIn("<h1><span>Hello</span></h1>", html)
+
+    def test_render_page_base_path(self):
+        _, html = render_page("/ssg/", "# Hello\n\n[home](/)", TEMPLATE)
+        self.assertIn('href="/ssg/index.css"', html)
+        self.assertIn('href="/ssg/"', html)
+
+    def test_render_page_toc(self):
+        template = "<nav>{{ TOC }}</nav>{{ Content }}"
+        transforms = [HeadingAnchors(), TableOfContents()]
+        _, html = render_page("/", "# Hello\n\n## Part", template, transforms)
+        self.assertIn('<a href="#part">Part</a>', html)
+        self.assertIn('<h2 id="part"><span>Part</span></h2>', html)
+
+    def test_build_in_memory(self):
+        fs = make_site()
+        result = build(BuildConfig(fs=fs))
+        self.assertTrue(result.ok)
+        self.assertEqual(sorted(p.dest for p in result.pages), ["docs/blog/post/index.html", "docs/index.html"])
+        self.assertEqual(sorted(result.static_files), ["docs/images/a.png", "docs/index.css"])
+        self.assertIn("<b>bold</b>", fs.read_text("docs/blog/post/index.html"))
+        self.assertEqual(fs.read_bytes("docs/images/a.png"), b"\x89PNG")
+        self.assertIn("total", result.timings)
+
+    def test_build_through_arena(self):
+        markdown = "# Home\n\n## Part\n\n> a [quote](/q)\n\n- ![a](/images/a.png)\n- `x`\n\n```\ncode\n```"
+        outputs = []
+        for arena in (False, True):
+            fs = make_site()
+            fs.write_text("content/index.md", markdown)
+            fs.write_text("template.html", "<nav>{{ TOC }}</nav>{{ Content }}")
+            config = BuildConfig(base_path="/ssg/", transforms=[HeadingAnchors(), TableOfContents()], arena=arena, fs=fs)
+            if arena:
+                # every page goes through the arena, no HTMLNode tree is built
+                with mock.patch("builder.markdown_to_html_node", side_effect=AssertionError):
+                    self.assertTrue(build(config).ok)
+            else:
+                self.assertTrue(build(config).ok)
+            outputs.append((fs.read_text("docs/index.html"), fs.read_text("docs/blog/post/index.html")))
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_build_with_partials(self):
+        fs = make_site()
+        fs.makedirs("partials")
+        fs.write_text("partials/nav.md", "- [Home](/)")
+        fs.write_text("template.html", "{{> nav }}{{> breadcrumbs }}{{ Content }}")
+        result = build(BuildConfig(base_path="/ssg/", fs=fs))
+        self.assertTrue(result.ok)
+        html = fs.read_text("docs/blog/post/index.html")
+        self.assertTrue(html.startswith('<div><ul><li><a href="/ssg/">Home</a></li></ul></div>'))
+        self.assertIn('<a href="/ssg/blog/">blog</a>', html)
+
+    def test_build_cache_reuses_parsed_pages(self):
+        fs = make_site()
+        cache = BuildCache()
+        build(BuildConfig(fs=fs), cache)
+        template = cache.templates[("template.html", "/")][1]
+        parsed = cache.pages["content/index.md"].parsed
+
+        fs.write_text("content/blog/post/index.md", "# Post\n\nChanged")
+        result = build(BuildConfig(fs=fs), cache)
+        self.assertTrue(result.ok)
+        self.assertIs(cache.templates[("template.html", "/")][1], template)
+        self.assertIs(cache.pages["content/index.md"].parsed, parsed)
+        self.assertIn("Changed", fs.read_text("docs/blog/post/index.html"))
+
+        fs.write_text("template.html", "new {{ Content }}")
+        build(BuildConfig(fs=fs), cache)
+        self.assertTrue(fs.read_text("docs/index.html").startswith("new "))
+
+    def test_warm_build_updates_output_in_place(self):
+        fs = make_site()
+        cache = BuildCache()
+        build(BuildConfig(fs=fs), cache)
+        copied = fs.mtime("docs/images/a.png")
+        listed = cache.listings["content"]
+
+        fs.makedirs("content/new")
+        fs.write_text("content/new/index.md", "# New")
+        fs.rmtree("content/blog")
+        result = build(BuildConfig(fs=fs), cache)
+        self.assertTrue(result.ok)
+        self.assertEqual(fs.mtime("docs/images/a.png"), copied)
+        self.assertIn("docs/images/a.png", result.static_files)
+        self.assertIsNot(cache.listings["content"], listed)
+        self.assertTrue(fs.isfile("docs/new/index.html"))
+        self.assertFalse(fs.exists("docs/blog"))
+
+        listed = cache.listings["content"]
+        fs.write_bytes("static/images/a.png", b"\x89PNG2")
+        build(BuildConfig(fs=fs), cache)
+        self.assertIs(cache.listings["content"], listed)
+        self.assertEqual(fs.read_bytes("docs/images/a.png"), b"\x89PNG2")
+
+    def test_build_inlines_css(self):
+        fs = make_site()
+        result = build(BuildConfig(base_path="/ssg/", inline_css_threshold=1024, fs=fs))
+        self.assertTrue(result.ok)
+        for path in ("docs/index.html", "docs/blog/post/index.html"):
+            html = fs.read_text(path)
+            self.assertIn("<style>body{}</style>", html)
+            self.assertNotIn("index.css", html)
+
+    def test_build_image_attributes(self):
+        fs = make_site()
+        fs.write_bytes("static/images/a.png", b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x02\x00\x00\x00\x03")
+        fs.write_text("content/index.md", "# Home\n\n![a](/images/a.png)\n\n![b](/images/a.png)")
+        result = build(BuildConfig(image_attributes=True, fs=fs))
+        self.assertTrue(result.ok)
+        html = fs.read_text("docs/index.html")
+        self.assertIn('<img src="/images/a.png" alt="a" width="2" height="3" decoding="async"></img>', html)
+        self.assertIn('alt="b" width="2" height="3" loading="lazy" decoding="async"', html)
+        self.assertTrue(fs.isfile(".ssg-cache/images.json"))
+
+    def test_warm_build_sees_resized_images(self):
+        fs = make_site()
+        fs.write_bytes("static/images/a.png", b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x02\x00\x00\x00\x03")
+        fs.write_text("content/index.md", "# Home\n\n![a](/images/a.png)")
+        cache = BuildCache()
+        build(BuildConfig(image_attributes=True, fs=fs), cache)
+        self.assertIn('width="2" height="3"', fs.read_text("docs/index.html"))
+
+        fs.write_bytes("static/images/a.png", b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x05\x00\x00\x00\x07")
+        build(BuildConfig(image_attributes=True, fs=fs), cache)
+        self.assertIn('width="5" height="7"', fs.read_text("docs/index.html"))
+
+    def test_build_resource_hints(self):
+        fs = make_site()
+        fs.write_text("content/index.md", "# Home\n\n![a](/images/a.png)\n\n[post](/blog/post)")
+        result = build(BuildConfig(base_path="/ssg/", max_preload=1, max_prefetch=2, fs=fs))
+        self.assertTrue(result.ok)
+        html = fs.read_text("docs/index.html")
+        self.assertIn('<link rel="preload" as="image" href="/ssg/images/a.png" /><link rel="prefetch" href="/ssg/blog/post" /></head>', html)
+
+        build(BuildConfig(fs=fs))
+        self.assertNotIn('rel="preload"', fs.read_text("docs/index.html"))
+
+    def test_build_cleans_output(self):
+        fs = make_site()
+        fs.makedirs("docs")
+        fs.write_text("docs/stale.html", "old")
+        build(BuildConfig(fs=fs))
+        self.assertFalse(fs.exists("docs/stale.html"))
+
+    def test_build_collects_errors(self):
+        fs = make_site()
+        fs.write_text("content/broken.md", "no title here")
+        result = build(BuildConfig(fs=fs))
+        self.assertFalse(result.ok)
+        self.assertEqual(result.errors, [("content/broken.md", "no # header")])
+        self.assertEqual(len(result.pages), 2)
+
+    def test_build_missing_static(self):
+        fs = make_site({"static/index.css": None, "static/images/a.png": None, "content/blog/post/index.md": None})
+        result = build(BuildConfig(fs=fs))
+        self.assertEqual(result.errors, [("static", "directory 'static' not exists")])
+        self.assertEqual(len(result.pages), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from css import find_stylesheets, minify_css, absolute_urls, bundle_stylesheets
+from fixtures import make_site
+
+
+HEAD = (
+    '<link href="/small.css" rel="stylesheet" />'
+    '<link href="/big.css" rel="stylesheet" />'
+    '<link href="/more.css" rel="stylesheet" />'
+    '<link href="https://cdn.example.com/x.css" rel="stylesheet" />'
+    '<link rel="icon" href="/favicon.ico" />'
+)
+
+
+STYLESHEETS = {
+    "static/small.css": "body {\n  color: red;\n}\n",
+    "static/big.css": "/* big */\n.a { background: url(images/bg.png); }\n" + ".b { margin: 0; }\n" * 20,
+    "static/more.css": "p { padding: 1px; }\n" * 20,
+}
+
+
+def make_fs():
+    # the bundle is written into an output dir the build would have made
+    fs = make_site(STYLESHEETS)
+    fs.makedirs("docs")
+    return fs
+
+
+class TestCSS(unittest.TestCase):
+    def test_find_stylesheets(self):
+        self.assertEqual(
+            [href for _, href in find_stylesheets(HEAD)],
+            ["/small.css", "/big.css", "/more.css"],
+        )
+
+    def test_minify_css(self):
+        css = "/* c */\nbody {\n  color: red;\n  margin: 0 auto;\n}\n\na > b, i { x: y; }"
+        self.assertEqual(minify_css(css), "body{color:red;margin:0 auto}a>b,i{x:y}")
+
+    def test_absolute_urls(self):
+        css = "a{background:url(images/a.png)}b{background:url('/x.png')}c{background:url(data:abc)}"
+        self.assertEqual(
+            absolute_urls(css, "/css/site.css", "/ssg/"),
+            "a{background:url(/ssg/css/images/a.png)}b{background:url('/x.png')}c{background:url(data:abc)}",
+        )
+
+    def test_bundle_stylesheets(self):
+        fs = make_fs()
+        template, bundle = bundle_stylesheets(HEAD, fs, "static", "docs", 100)
+        self.assertTrue(bundle.startswith("docs/bundle."))
+        self.assertTrue(bundle.endswith(".css"))
+        name = bundle[len("docs"):]
+        self.assertEqual(
+            template,
+            '<style>body{color:red}</style>'
+            f'<link href="{name}" rel="stylesheet" />'
+            '<link href="https://cdn.example.com/x.css" rel="stylesheet" />'
+            '<link rel="icon" href="/favicon.ico" />',
+        )
+        css = fs.read_text(bundle)
+        self.assertTrue(css.startswith(".a{background:url(/images/bg.png)}"))
+        self.assertIn("p{padding:1px}", css)
+
+    def test_bundle_name_is_content_fingerprint(self):
+        _, first = bundle_stylesheets(HEAD, make_fs(), "static", "docs", 100)
+        _, second = bundle_stylesheets(HEAD, make_fs(), "static", "docs", 100)
+        self.assertEqual(first, second)
+        fs = make_fs()
+        fs.write_text("static/more.css", "p { padding: 2px; }\n" * 20)
+        _, changed = bundle_stylesheets(HEAD, fs, "static", "docs", 100)
+        self.assertNotEqual(first, changed)
+
+    def test_critical_always_inlined(self):
+        head = '<link href="/big.css" rel="stylesheet" data-critical />'
+        template, bundle = bundle_stylesheets(head, make_fs(), "static", "docs", 0)
+        self.assertIsNone(bundle)
+        self.assertTrue(template.startswith("<style>.a{"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import json
+import socket
+import shutil
+import tempfile
+import threading
+import unittest
+
+from daemon import BuildServer, send_request, request_or_fallback
+
+
+def write(root, path, text):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        write(self.root, "template.html", "<title>{{ Title }}</title>{{ Content }}")
+        write(self.root, "static/index.css", "body {}")
+        write(self.root, "content/index.md", "# Home\n\n[post](/post)")
+        self.socket_path = os.path.join(self.root, "ssg.sock")
+
+    def start_server(self, idle_timeout: float = 5.0):
+        server = BuildServer(self.socket_path, idle_timeout)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(send_request, self.socket_path, {"op": "shutdown"})
+        return server
+
+    def test_build_and_render(self):
+        server = self.start_server()
+        self.assertEqual(send_request(self.socket_path, {"op": "ping"}), {"ok": True})
+
+        response = send_request(self.socket_path, {"op": "build", "cwd": self.root, "base_path": "/ssg/"})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["pages"], 1)
+        with open(os.path.join(self.root, "docs/index.html")) as f:
+            self.assertEqual(f.read(), '<title>Home</title><div><h1><span>Home</span></h1><p><a href="/ssg/post">post</a></p></div>')
+
+        send_request(self.socket_path, {"op": "build", "cwd": self.root, "base_path": "/ssg/"})
+        self.assertEqual(len(server.cache.pages), 1)
+        self.assertEqual(len(server.cache.templates), 1)
+
+        response = send_request(self.socket_path, {"op": "render", "cwd": self.root, "markdown": "# Preview"})
+        self.assertEqual(response["html"], "<title>Preview</title><div><h1><span>Preview</span></h1></div>")
+
+    def test_errors_are_reported(self):
+        self.start_server()
+        response = send_request(self.socket_path, {"op": "render", "cwd": self.root, "markdown": "no title"})
+        self.assertEqual(response, {"ok": False, "error": "no # header"})
+        response = send_request(self.socket_path, {"op": "nope"})
+        self.assertEqual(response, {"ok": False, "error": "unknown op: nope"})
+
+    def test_malformed_request(self):
+        self.start_server()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            sock.sendall(b'{"op": \n["ping"]\n{"op": "ping"}\n')
+            with sock.makefile("rb") as f:
+                responses = [json.loads(f.readline()) for _ in range(3)]
+        self.assertFalse(responses[0]["ok"])
+        self.assertTrue(responses[0]["error"].startswith("malformed request"))
+        self.assertFalse(responses[1]["ok"])
+        self.assertEqual(responses[2], {"ok": True})
+
+    def test_build_options(self):
+        self.start_server()
+        options = {"service_worker": True, "block_cache_bytes": 1000, "budget": [10, None, None]}
+        response = send_request(self.socket_path, {"op": "build", "cwd": self.root, "options": options})
+        self.assertTrue(response["ok"])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs/sw.js")))
+        self.assertTrue(os.path.exists(os.path.join(self.root, ".ssg-cache/blocks.json")))
+        self.assertEqual(len(response["budget_violations"]), 1)
+
+        response = send_request(self.socket_path, {"op": "build", "cwd": self.root, "options": {"minify": True}})
+        self.assertEqual(response, {"ok": False, "error": "unknown build options: minify"})
+
+    def test_idle_client_is_dropped(self):
+        self.start_server(idle_timeout=0.1)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(self.socket_path)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(5)
+                sock.connect(self.socket_path)
+                sock.sendall(b'{"op": "ping"}\n')
+                with sock.makefile("rb") as f:
+                    self.assertEqual(json.loads(f.readline()), {"ok": True})
+
+    def test_fallback_without_daemon(self):
+        response = request_or_fallback(self.socket_path, {"op": "build", "cwd": self.root})
+        self.assertTrue(response["ok"])
+        self.assertTrue(os.path.exists(os.path.join(self.root, "docs/index.html")))
+        response = request_or_fallback(self.socket_path, {"op": "ping"})
+        self.assertFalse(response["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+
+from fs import MemoryFS, OverlayFS
+
+
+class TestMemoryFS(unittest.TestCase):
+    def test_read_write(self):
+        fs = MemoryFS()
+        fs.makedirs("a/b")
+        fs.write_text("a/b/c.txt", "hello")
+        self.assertEqual(fs.read_text("a/b/c.txt"), "hello")
+        self.assertEqual(fs.read_bytes("./a/b/c.txt"), b"hello")
+        self.assertTrue(fs.isfile("a/b/c.txt"))
+        self.assertTrue(fs.isdir("a/b"))
+        self.assertTrue(fs.exists("a"))
+
+    def test_initial_files_create_dirs(self):
+        fs = MemoryFS({"content/blog/post.md": "# Post", "template.html": b"<html></html>"})
+        self.assertEqual(fs.listdir("."), ["content", "template.html"])
+        self.assertEqual(fs.listdir("content"), ["blog"])
+        self.assertEqual(fs.listdir("content/blog"), ["post.md"])
+
+    def test_write_without_parent_raises(self):
+        fs = MemoryFS()
+        with self.assertRaises(FileNotFoundError):
+            fs.write_text("missing/file.txt", "x")
+
+    def test_read_missing_raises(self):
+        fs = MemoryFS()
+        with self.assertRaises(FileNotFoundError):
+            fs.read_text("nope.txt")
+
+    def test_rmtree(self):
+        fs = MemoryFS({"docs/a.html": "a", "docs/sub/b.html": "b", "keep.txt": "k"})
+        fs.rmtree("docs")
+        self.assertFalse(fs.exists("docs"))
+        self.assertFalse(fs.exists("docs/sub/b.html"))
+        self.assertTrue(fs.isfile("keep.txt"))
+
+    def test_copy_and_mtime(self):
+        fs = MemoryFS({"a.txt": "a"})
+        fs.copy("a.txt", "b.txt")
+        self.assertEqual(fs.read_text("b.txt"), "a")
+        self.assertGreater(fs.mtime("b.txt"), fs.mtime("a.txt"))
+
+    def test_listdir_after_changes(self):
+        fs = MemoryFS({"docs/a/b/c.html": "c", "docs/x.html": "x"})
+        self.assertEqual(fs.listdir("docs"), ["a", "x.html"])
+        fs.makedirs("docs/d/e")
+        self.assertEqual(fs.listdir("docs"), ["a", "d", "x.html"])
+        self.assertEqual(fs.listdir("docs/d"), ["e"])
+        fs.rmtree("docs/a")
+        fs.replace("docs/x.html", "docs/d/x.html")
+        self.assertEqual(fs.listdir("docs"), ["d"])
+        self.assertEqual(fs.listdir("docs/d"), ["e", "x.html"])
+        fs.rmtree("docs")
+        self.assertEqual(fs.listdir("."), [])
+
+    def test_append_and_replace(self):
+        fs = MemoryFS({"a.bin": b"ab"})
+        fs.append_bytes("a.bin", b"cd")
+        fs.append_bytes("new.bin", b"x")
+        self.assertEqual(fs.read_bytes("a.bin"), b"abcd")
+        self.assertEqual(fs.read_bytes("new.bin"), b"x")
+        fs.replace("new.bin", "a.bin")
+        self.assertEqual(fs.read_bytes("a.bin"), b"x")
+        self.assertFalse(fs.exists("new.bin"))
+
+
+class TestOverlayFS(unittest.TestCase):
+    def test_routes_prefix_to_upper(self):
+        lower = MemoryFS({"static/a.css": "a", "docs/old.html": "old"})
+        upper = MemoryFS()
+        fs = OverlayFS(lower, "docs", upper)
+        fs.makedirs("docs")
+        fs.copy("static/a.css", "docs/a.css")
+        self.assertEqual(upper.read_text("docs/a.css"), "a")
+        self.assertEqual(fs.listdir("docs"), ["a.css"])
+        fs.rmtree("docs")
+        self.assertTrue(lower.isfile("docs/old.html"))
+        self.assertTrue(fs.isfile("static/a.css"))
+        self.assertFalse(fs.exists("docs2/a.css"))
+
+
+if __name__ == "__main__":
+    unittest.main()
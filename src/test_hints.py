@@ -0,0 +1,33 @@
+import unittest
+
+from hints import PageHints
+
+
+class TestHints(unittest.TestCase):
+    def test_preload(self):
+        hints = PageHints("/ssg/", max_preload=1)
+        images = ["https://example.com/a.png", "/images/hero.png", "/images/b.png"]
+        self.assertEqual(hints.preload(images), ['<link rel="preload" as="image" href="/ssg/images/hero.png" />'])
+        self.assertEqual(PageHints(max_preload=0).preload(images), [])
+
+    def test_prefetch_links_first(self):
+        hints = PageHints(max_prefetch=3)
+        links = ["/", "/about#team", "https://example.com", "/about", "//cdn.example.com/x", "/blog/"]
+        self.assertEqual(hints.prefetch_candidates("/", links), ["/about", "/blog/"])
+
+    def test_prefetch_siblings(self):
+        hints = PageHints(max_prefetch=2)
+        hints.set_pages(["/", "/blog/a/", "/blog/b/", "/blog/c/", "/blog/d/"])
+        self.assertEqual(hints.prefetch_candidates("/blog/c/", []), ["/blog/d/", "/blog/a/"])
+        self.assertEqual(hints.prefetch_candidates("/blog/c/", ["/blog/d"]), ["/blog/d", "/blog/a/"])
+        self.assertEqual(hints.prefetch_candidates("/blog/b/", ["/"]), ["/", "/blog/c/"])
+
+    def test_render(self):
+        hints = PageHints("/ssg/", max_preload=1, max_prefetch=1)
+        html = hints.render("/", ["/a.png"], ["/about"])
+        self.assertEqual(html, '<link rel="preload" as="image" href="/ssg/a.png" /><link rel="prefetch" href="/ssg/about" />')
+        self.assertEqual(PageHints(max_preload=0, max_prefetch=0).render("/", ["/a.png"], ["/about"]), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
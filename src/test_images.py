@@ -0,0 +1,120 @@
+import struct
+import unittest
+
+from fs import DiskFS, MemoryFS
+from htmlnode import LeafNode, ParentNode
+from transforms import UrlRewrite, apply_transforms
+from images import ImageIndex, ImageAttributes, image_size
+
+
+def reader(data: bytes):
+    return lambda offset, length: data[offset:offset + length]
+
+
+def png(width, height):
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+
+
+def jpeg(width, height):
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    return b'\xff\xd8' + app0 + sof + b'\xff\xd9'
+
+
+class TestImageSize(unittest.TestCase):
+    def test_png(self):
+        self.assertEqual(image_size(reader(png(640, 480))), (640, 480))
+
+    def test_gif(self):
+        self.assertEqual(image_size(reader(b'GIF89a' + struct.pack('<HH', 32, 16) + b'\x00' * 20)), (32, 16))
+
+    def test_jpeg(self):
+        self.assertEqual(image_size(reader(jpeg(1024, 768))), (1024, 768))
+
+    def test_jpeg_static_file(self):
+        fs = DiskFS()
+        self.assertEqual(image_size(lambda o, n: fs.read_range("static/images/a.jpg", o, n)), (3840, 360))
+
+    def test_webp(self):
+        lossy = b'RIFF\x00\x00\x00\x00WEBPVP8 ' + b'\x00' * 10 + struct.pack('<HH', 300, 200)
+        self.assertEqual(image_size(reader(lossy)), (300, 200))
+        bits = (300 - 1) | ((200 - 1) << 14)
+        lossless = b'RIFF\x00\x00\x00\x00WEBPVP8L' + b'\x00' * 5 + struct.pack('<I', bits) + b'\x00' * 5
+        self.assertEqual(image_size(reader(lossless)), (300, 200))
+        extended = b'RIFF\x00\x00\x00\x00WEBPVP8X' + b'\x00' * 8 + (299).to_bytes(3, 'little') + (199).to_bytes(3, 'little')
+        self.assertEqual(image_size(reader(extended)), (300, 200))
+
+    def test_reads_only_the_header(self):
+        data = png(10, 20) + b'\x00' * 100000
+        reads = []
+
+        def read(offset, length):
+            reads.append(length)
+            return data[offset:offset + length]
+
+        self.assertEqual(image_size(read), (10, 20))
+        self.assertLessEqual(sum(reads), 64)
+
+    def test_unknown(self):
+        self.assertIsNone(image_size(reader(b'not an image')))
+
+
+class TestImageIndex(unittest.TestCase):
+    def test_index_is_persisted(self):
+        fs = MemoryFS({"static/a.png": png(5, 6), "static/b.png": png(5, 6)})
+        index = ImageIndex.load(fs, ".ssg-cache/images.json")
+        self.assertEqual(index.size("static/a.png"), (5, 6))
+        self.assertEqual(index.size("static/b.png"), (5, 6))
+        self.assertEqual(len(index.sizes), 1)
+        self.assertIsNone(index.size("static/missing.png"))
+        index.save()
+
+        loaded = ImageIndex.load(fs, ".ssg-cache/images.json")
+        self.assertEqual(loaded.files, index.files)
+        self.assertEqual(loaded.size("static/a.png"), (5, 6))
+        self.assertFalse(loaded.dirty)
+
+        fs.write_bytes("static/a.png", png(7, 8))
+        self.assertEqual(loaded.size("static/a.png"), (7, 8))
+
+    def test_damaged_index_is_dropped(self):
+        fs = MemoryFS({"static/a.png": png(5, 6)})
+        index = ImageIndex.load(fs, ".ssg-cache/images.json")
+        index.size("static/a.png")
+        index.save()
+        self.assertFalse(fs.exists(".ssg-cache/images.json.tmp"))
+
+        data = fs.read_text(".ssg-cache/images.json")
+        for damaged in (data[:len(data) // 2], "[]", '{"files": []}'):
+            fs.write_text(".ssg-cache/images.json", damaged)
+            loaded = ImageIndex.load(fs, ".ssg-cache/images.json")
+            self.assertEqual((loaded.files, loaded.sizes), ({}, {}))
+            self.assertEqual(loaded.size("static/a.png"), (5, 6))
+
+
+class TestImageAttributes(unittest.TestCase):
+    def test_attributes(self):
+        fs = MemoryFS({"static/images/a.png": png(100, 50)})
+        node = ParentNode("div", [
+            LeafNode("img", "", props={"src": "/images/a.png", "alt": "a"}),
+            LeafNode("img", "", props={"src": "/images/a.png", "alt": "b"}),
+            LeafNode("img", "", props={"src": "https://example.com/c.png", "alt": "c"}),
+        ])
+        apply_transforms(node, [ImageAttributes(ImageIndex(fs), "static"), UrlRewrite("/ssg/")])
+        self.assertEqual(
+            node.to_html(),
+            '<div>'
+            '<img src="/ssg/images/a.png" alt="a" width="100" height="50" decoding="async"></img>'
+            '<img src="/ssg/images/a.png" alt="b" width="100" height="50" loading="lazy" decoding="async"></img>'
+            '<img src="https://example.com/c.png" alt="c" loading="lazy" decoding="async"></img>'
+            '</div>',
+        )
+
+    def test_lazy_first_image(self):
+        node = ParentNode("p", [LeafNode("img", "", props={"src": "/x.png", "alt": ""})])
+        apply_transforms(node, [ImageAttributes(ImageIndex(MemoryFS()), "static", eager_first=False)])
+        self.assertEqual(node.children[0].props["loading"], "lazy")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import gc
+import sys
+import random
+import time
+import unittest
+
+from converter import markdown_to_html_node
+
+# generators for adversarial markdown, each returns roughly n units of input
+ADVERSARIAL = {
+    'links on one line': lambda n: ' '.join(f'[l{i}](/u{i})' for i in range(n)),
+    'images on one line': lambda n: ' '.join(f'![a{i}](/i{i}.png)' for i in range(n)),
+    'links and images': lambda n: ''.join(f'![a](/a.png)[b](/b){i}' for i in range(n)),
+    'unclosed links': lambda n: '[a](' * n,
+    'unbalanced brackets': lambda n: '[' * n + '](' + ')' * n,
+    'long unordered list': lambda n: '\n'.join(f'- item {i} [x](/x)' for i in range(n)),
+    'long ordered list': lambda n: '\n'.join(f'{i}. item' for i in range(1, n + 1)),
+    'broken ordered list': lambda n: '\n'.join(f'{i}. item' for i in range(1, n)) + '\n1. item',
+    'long quote': lambda n: '\n'.join(f'> line {i} `code`' for i in range(n)),
+    'many paragraphs': lambda n: '\n\n'.join(f'para **{i}** _x_' for i in range(n)),
+}
+
+# work per input character at SCALE times the input may grow by at most
+# SLACK, quadratic work grows by SCALE. the suite counts characters handed
+# to str methods, which is deterministic, bench_linear.py times the same
+# inputs at sizes where cheap quadratic copying shows up too.
+SMALL = 500
+SCALE = 16
+SLACK = 3
+
+
+def _render(markdown: str):
+    try:
+        markdown_to_html_node(markdown).to_html()
+    except Exception as e:
+        if str(e) != 'invalid Markdown syntax':
+            raise
+
+
+def _seconds(markdown: str, repeat: int) -> float:
+    # best of repeat runs, each long enough for the timer to be accurate
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            _render(markdown)
+        if time.perf_counter() - start > 0.005:
+            break
+        loops *= 2
+
+    best = None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                _render(markdown)
+            elapsed = (time.perf_counter() - start) / loops
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        gc.enable()
+    return best
+
+
+def _work(markdown: str) -> int:
+    # characters of every string a str method was called on while rendering,
+    # a splitter that rescans the rest of the line per match is quadratic here
+    total = 0
+
+    def count(frame, event, arg):
+        nonlocal total
+        if event == 'c_call' and isinstance(getattr(arg, '__self__', None), str):
+            total += len(arg.__self__)
+
+    sys.setprofile(count)
+    try:
+        _render(markdown)
+    finally:
+        sys.setprofile(None)
+    return total
+
+
+def work_growth(generate, small: int = SMALL, scale: int = SCALE) -> float:
+    # like growth() but counts work instead of timing it
+    small_text = generate(small)
+    large_text = generate(small * scale)
+    return (_work(large_text) / len(large_text)) / (_work(small_text) / len(small_text))
+
+
+def growth(generate, small: int = SMALL, scale: int = SCALE) -> float:
+    # per character cost at the large size relative to the small size,
+    # around 1 for linear work
+    small_text = generate(small)
+    large_text = generate(small * scale)
+    small_seconds = _seconds(small_text, 3)
+    large_seconds = _seconds(large_text, 2)
+    return (large_seconds / len(large_text)) / (small_seconds / len(small_text))
+
+
+def fuzz_markdown(rng: random.Random, size: int) -> str:
+    pieces = ['[', ']', '(', ')', '!', '**', '_', '`', '\n', '\n\n', '- ', '1. ', '> ', '# ', 'a', ' ', '/x', '```']
+    return ''.join(rng.choice(pieces) for _ in range(size))
+
+
+class TestLinear(unittest.TestCase):
+    def test_scaling(self):
+        for name, generate in ADVERSARIAL.items():
+            with self.subTest(name):
+                self.assertLess(work_growth(generate), SLACK)
+
+    def test_fuzz(self):
+        # only the documented syntax error may escape the converter
+        rng = random.Random(38)
+        for _ in range(200):
+            _render(fuzz_markdown(rng, 200))
+
+    def test_fuzz_scaling(self):
+        rng = random.Random(38)
+        pieces = fuzz_markdown(rng, SMALL * SCALE)
+        self.assertLess(work_growth(lambda n: pieces[:n * 4]), SLACK)
+
+
+if __name__ == "__main__":
+    unittest.main()
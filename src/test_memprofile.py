@@ -0,0 +1,57 @@
+import tracemalloc
+import unittest
+
+from builder import BuildConfig, build
+from memprofile import MemoryProfiler, STAGES, format_report
+from fixtures import make_site
+
+FILES = {
+    "content/index.md": "# Home\n\nsmall",
+    "content/blog/post/index.md": None,
+    "content/big.md": "# Big\n\n" + "\n\n".join(f"paragraph **{i}** with [a link](/x/{i})" for i in range(500)),
+}
+
+
+class TestMemoryProfiler(unittest.TestCase):
+    def test_stage(self):
+        profiler = MemoryProfiler()
+        profiler.start()
+        try:
+            profiler.begin_page("page")
+            with profiler.stage("read"):
+                kept = [bytearray(1000) for _ in range(100)]
+            with profiler.stage("to_html"):
+                temp = bytearray(500000)
+                del temp
+            page = profiler.end_page()
+        finally:
+            profiler.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(page.stages["read"].retained, 100000)
+        self.assertGreaterEqual(page.stages["to_html"].peak, 500000)
+        self.assertLess(page.stages["to_html"].retained, 10000)
+        self.assertGreaterEqual(page.peak, 500000)
+        self.assertTrue(any(stage == "read" for stage, _ in profiler.sites))
+        del kept
+
+    def test_build_profile(self):
+        result = build(BuildConfig(profile_memory=True, fs=make_site(FILES)))
+        self.assertTrue(result.ok)
+        profiler = result.memory
+        self.assertEqual(len(profiler.pages), 2)
+        for page in profiler.pages:
+            self.assertEqual(tuple(page.stages), STAGES)
+        self.assertEqual(profiler.heaviest_pages()[0].path, "content/big.md")
+        self.assertGreater(len(profiler.top_sites()), 0)
+        report = format_report(profiler)
+        self.assertIn("memory by stage", report)
+        self.assertIn("content/big.md", report)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_off_by_default(self):
+        result = build(BuildConfig(fs=make_site(FILES)))
+        self.assertIsNone(result.memory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import unittest
+
+from fs import MemoryFS
+from builder import BuildConfig, build
+from offline import file_url, precache_manifest, registration_script, revision
+from fixtures import make_site
+
+FILES = {"content/about.md": "# About", "static/images/a.png": None}
+
+
+class TestOffline(unittest.TestCase):
+    def test_file_url(self):
+        self.assertEqual(file_url("docs", "docs/index.html"), "/")
+        self.assertEqual(file_url("docs", "docs/blog/post/index.html", "/ssg/"), "/ssg/blog/post/")
+        self.assertEqual(file_url("docs", "docs/about.html", "/ssg/"), "/ssg/about.html")
+        self.assertEqual(file_url("docs", "docs/index.css", "/ssg/"), "/ssg/index.css")
+
+    def test_precache_manifest(self):
+        fs = MemoryFS({"docs/index.html": "home", "docs/index.css": "body {}"})
+        manifest = precache_manifest(["docs/index.html", "docs/index.css"], "docs", "/ssg/", fs)
+        self.assertEqual(manifest, [
+            {"url": "/ssg/", "revision": revision(b"home")},
+            {"url": "/ssg/index.css", "revision": revision(b"body {}")},
+        ])
+
+    def test_build_service_worker(self):
+        fs = make_site(FILES)
+        result = build(BuildConfig(base_path="/ssg/", service_worker=True, fs=fs))
+        self.assertTrue(result.ok)
+        self.assertIn("docs/sw.js", result.static_files)
+        manifest = json.loads(fs.read_text("docs/precache-manifest.json"))
+        self.assertEqual([entry["url"] for entry in manifest], ["/ssg/", "/ssg/about.html", "/ssg/blog/post/", "/ssg/index.css"])
+        self.assertIn(json.dumps(manifest), fs.read_text("docs/sw.js"))
+        self.assertIn(registration_script("/ssg/"), fs.read_text("docs/index.html"))
+
+    def test_revisions_stable_across_builds(self):
+        fs = make_site(FILES)
+        build(BuildConfig(service_worker=True, fs=fs))
+        first = {e["url"]: e["revision"] for e in json.loads(fs.read_text("docs/precache-manifest.json"))}
+        worker = fs.read_text("docs/sw.js")
+
+        build(BuildConfig(service_worker=True, fs=fs))
+        self.assertEqual(fs.read_text("docs/sw.js"), worker)
+
+        fs.write_text("content/about.md", "# About us")
+        build(BuildConfig(service_worker=True, fs=fs))
+        second = {e["url"]: e["revision"] for e in json.loads(fs.read_text("docs/precache-manifest.json"))}
+        self.assertNotEqual(first.pop("/about.html"), second.pop("/about.html"))
+        self.assertEqual(first, second)
+
+    def test_build_without_service_worker(self):
+        fs = make_site(FILES)
+        build(BuildConfig(fs=fs))
+        self.assertFalse(fs.exists("docs/sw.js"))
+        self.assertNotIn("serviceWorker", fs.read_text("docs/index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
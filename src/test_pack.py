@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import http.client
+
+from fs import DiskFS, MemoryFS
+from builder import BuildConfig, build
+from pack import Pack, PackEntry, content_type, pack_output
+from packserve import PackServer
+from fixtures import make_site, site_files
+
+
+class TestPack(unittest.TestCase):
+    def test_content_type(self):
+        self.assertEqual(content_type("/index.html"), "text/html; charset=utf-8")
+        self.assertEqual(content_type("/images/a.png"), "image/png")
+        self.assertEqual(content_type("/data.unknown"), "application/octet-stream")
+
+    def test_update_appends_changed_entries(self):
+        fs = MemoryFS()
+        pack = Pack(fs, "site.pack")
+        pack.update({"/a.html": b"aaa", "/b.css": b"bb"})
+        self.assertEqual(fs.read_bytes("site.pack"), b"aaabb")
+        self.assertEqual(pack.entries["/b.css"], PackEntry(3, 2, "text/css; charset=utf-8", pack.entries["/b.css"].digest))
+        pack.save()
+
+        pack = Pack.load(fs, "site.pack")
+        pack.update({"/a.html": b"aaa", "/b.css": b"BB", "/c.js": b"c"})
+        self.assertEqual(pack.appended, 3)
+        self.assertEqual(fs.read_bytes("site.pack"), b"aaabbBBc")
+        self.assertEqual(pack.read("/a.html"), b"aaa")
+        self.assertEqual(pack.read("/b.css"), b"BB")
+        self.assertEqual(pack.live_bytes(), 6)
+
+        pack.update({"/c.js": b"c"})
+        self.assertEqual(pack.appended, 0)
+        self.assertEqual(list(pack.entries), ["/c.js"])
+
+    def test_update_keep(self):
+        fs = MemoryFS()
+        pack = Pack(fs, "site.pack")
+        pack.update({"/a.html": b"aaa", "/b.css": b"bb"})
+        pack.update({"/a.html": b"AAA"}, keep=True)
+        self.assertEqual(sorted(pack.entries), ["/a.html", "/b.css"])
+        self.assertEqual(pack.read("/a.html"), b"AAA")
+        self.assertEqual(pack.read("/b.css"), b"bb")
+
+    def test_compact(self):
+        fs = MemoryFS()
+        pack = Pack(fs, "site.pack")
+        pack.update({"/a.html": b"aaa", "/b.css": b"bb"})
+        pack.update({"/a.html": b"AAA", "/b.css": b"bb"})
+        pack.compact()
+        self.assertEqual(fs.read_bytes("site.pack"), b"bbAAA")
+        self.assertEqual(pack.size, 5)
+        self.assertEqual(pack.read("/a.html"), b"AAA")
+        self.assertFalse(fs.exists("site.pack.tmp"))
+
+    def test_pack_output_compacts(self):
+        fs = MemoryFS({"docs/index.html": "x" * 10, "docs/a.css": "a"})
+        pack = pack_output(fs, "docs", ["docs/index.html", "docs/a.css"], fs, "site.pack")
+        self.assertEqual(pack.size, 11)
+        fs.write_text("docs/index.html", "y" * 10)
+        pack = pack_output(fs, "docs", ["docs/index.html", "docs/a.css"], fs, "site.pack")
+        self.assertEqual(pack.size, 21)
+        fs.write_text("docs/index.html", "z" * 10)
+        pack = pack_output(fs, "docs", ["docs/index.html", "docs/a.css"], fs, "site.pack")
+        self.assertEqual(pack.size, 11)
+        self.assertEqual(Pack.load(fs, "site.pack").read("/index.html"), b"z" * 10)
+
+    def test_build_into_pack(self):
+        fs = make_site()
+        result = build(BuildConfig(base_path="/ssg/", pack_path="site.pack", fs=fs))
+        self.assertTrue(result.ok)
+        self.assertFalse(fs.exists("docs"))
+        pack = Pack.load(fs, "site.pack")
+        self.assertEqual(sorted(pack.entries), ["/blog/post/index.html", "/images/a.png", "/index.css", "/index.html"])
+        self.assertIn(b"<title>Post</title>", pack.read("/blog/post/index.html"))
+
+        fs.write_text("content/index.md", "# New home")
+        result = build(BuildConfig(base_path="/ssg/", pack_path="site.pack", fs=fs))
+        self.assertEqual(result.pack.appended, len(result.pack.read("/index.html")))
+
+
+class TestPackServer(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.fs = DiskFS(self.root)
+        for path, data in site_files().items():
+            self.fs.makedirs(os.path.dirname(path) or ".")
+            self.fs.write_bytes(path, data.encode() if isinstance(data, str) else data)
+        self.assertTrue(build(BuildConfig(base_path="/ssg/", pack_path="site.pack", fs=self.fs)).ok)
+
+        self.server = PackServer(("127.0.0.1", 0), os.path.join(self.root, "site.pack"), "/ssg/", reload_interval=0)
+        thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.01})
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def get(self, path: str, headers: dict = None, method: str = "GET"):
+        connection = http.client.HTTPConnection(*self.server.server_address)
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response, body
+
+    def test_serves_pages_and_assets(self):
+        response, body = self.get("/ssg/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/html; charset=utf-8")
+        self.assertIn(b"<title>Home</title>", body)
+
+        response, body = self.get("/ssg/images/a.png")
+        self.assertEqual((response.status, body), (200, b"\x89PNG"))
+
+        response, body = self.get("/ssg/index.css", method="HEAD")
+        self.assertEqual((response.status, response.getheader("Content-Length"), body), (200, "7", b""))
+
+    def test_redirects_and_missing(self):
+        response, _ = self.get("/ssg/blog/post")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/ssg/blog/post/"))
+        response, _ = self.get("/ssg")
+        self.assertEqual((response.status, response.getheader("Location")), (301, "/ssg/"))
+        self.assertEqual(self.get("/ssg/missing.html")[0].status, 404)
+        self.assertEqual(self.get("/other/")[0].status, 404)
+
+    def test_etag(self):
+        response, _ = self.get("/ssg/index.css")
+        etag = response.getheader("ETag")
+        response, body = self.get("/ssg/index.css", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+
+    def test_without_sendfile(self):
+        self.server.use_sendfile = False
+        self.assertEqual(self.get("/ssg/images/a.png")[1], b"\x89PNG")
+
+    def test_reload_after_rebuild(self):
+        self.fs.write_text("content/index.md", "# Rebuilt")
+        self.assertTrue(build(BuildConfig(base_path="/ssg/", pack_path="site.pack", fs=self.fs)).ok)
+        self.server.site.reload()
+        self.assertIn(b"<title>Rebuilt</title>", self.get("/ssg/")[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+
+from builder import BuildConfig, build
+from pack import Pack
+from schedule import Scheduler, load_priority_list
+from fixtures import make_site
+
+FILES = {
+    "static/images/a.png": None,
+    "content/about.md": "# About",
+    "content/blog/a/index.md": "# A",
+    "content/blog/b/index.md": "# B",
+    "content/blog/post/index.md": None,
+    "priority.txt": "# most visited first\n/ssg/\n\n/ssg/blog/b/\n/missing/\n",
+}
+
+
+JOBS = [
+    ("content/about.md", "docs/about.html"),
+    ("content/blog/a/index.md", "docs/blog/a/index.html"),
+    ("content/blog/b/index.md", "docs/blog/b/index.html"),
+    ("content/index.md", "docs/index.html"),
+]
+URLS = ["/about.html", "/blog/a/", "/blog/b/", "/"]
+
+
+class TestSchedule(unittest.TestCase):
+    def test_load_priority_list(self):
+        fs = make_site(FILES)
+        self.assertEqual(load_priority_list(fs, "priority.txt", "/ssg/"), ["/", "/blog/b/", "/missing/"])
+
+    def test_order_by_priority_list(self):
+        fs = make_site(FILES)
+        scheduler = Scheduler(fs, ".ssg-cache/schedule.json", ["/", "/blog/b", "/blog/b/index.html", "/missing/"])
+        jobs, count = scheduler.order(JOBS, URLS)
+        self.assertEqual(count, 2)
+        self.assertEqual([dst for _, dst in jobs], [
+            "docs/index.html",
+            "docs/blog/b/index.html",
+            "docs/about.html",
+            "docs/blog/a/index.html",
+        ])
+
+    def test_recent_first(self):
+        fs = make_site(FILES)
+        scheduler = Scheduler(fs, ".ssg-cache/schedule.json", ["/"])
+        # nothing counts as recent before the first build
+        self.assertEqual(scheduler.order(JOBS, URLS)[1], 1)
+        scheduler.save()
+
+        fs.write_text("content/blog/a/index.md", "# A again")
+        fs.write_text("content/about.md", "# About again")
+        scheduler = Scheduler.load(fs, ".ssg-cache/schedule.json", ["/"])
+        jobs, count = scheduler.order(JOBS, URLS)
+        self.assertEqual(count, 3)
+        self.assertEqual([src for src, _ in jobs][:3], ["content/about.md", "content/blog/a/index.md", "content/index.md"])
+
+    def test_damaged_state_is_dropped(self):
+        fs = make_site(FILES)
+        scheduler = Scheduler(fs, ".ssg-cache/schedule.json", ["/"])
+        scheduler.order(JOBS, URLS)
+        scheduler.save()
+        self.assertFalse(fs.exists(".ssg-cache/schedule.json.tmp"))
+
+        data = fs.read_text(".ssg-cache/schedule.json")
+        for damaged in (data[:len(data) // 2], "[]"):
+            fs.write_text(".ssg-cache/schedule.json", damaged)
+            scheduler = Scheduler.load(fs, ".ssg-cache/schedule.json", ["/"])
+            self.assertIsNone(scheduler.seen)
+            self.assertEqual(scheduler.order(JOBS, URLS)[1], 1)
+
+    def test_build_reports_priority(self):
+        fs = make_site(FILES)
+        result = build(BuildConfig(base_path="/ssg/", priority_path="priority.txt", fs=fs))
+        self.assertTrue(result.ok)
+        self.assertEqual([page.dest for page in result.pages][:2], ["docs/index.html", "docs/blog/b/index.html"])
+        self.assertEqual(result.priority_count, 2)
+        self.assertLessEqual(result.timings["first_page"], result.timings["priority_pages"])
+        self.assertLessEqual(result.timings["priority_pages"], result.timings["total"])
+        self.assertTrue(fs.isfile(".ssg-cache/schedule.json"))
+
+    def test_background_build(self):
+        fs = make_site(FILES)
+        result = build(BuildConfig(base_path="/ssg/", priority_path="priority.txt", background=True, fs=fs))
+        # the priority pages are already written when build returns
+        self.assertTrue(fs.isfile("docs/index.html"))
+        self.assertTrue(fs.isfile("docs/blog/b/index.html"))
+        result.wait()
+        self.assertTrue(result.ok)
+        self.assertIsNone(result.pending)
+        self.assertEqual(len(result.pages), 4)
+        self.assertIn("total", result.timings)
+
+    def test_scheduled_build_keeps_output(self):
+        fs = make_site(FILES)
+        self.assertTrue(build(BuildConfig(base_path="/ssg/", fs=fs)).ok)
+        fs.write_text("docs/old.html", "old")
+        fs.remove("content/about.md")
+
+        # the previous pages stay in place while the new ones are rendered
+        seen = []
+        log = lambda message: seen.append(fs.isfile("docs/blog/a/index.html"))
+        result = build(BuildConfig(base_path="/ssg/", priority_path="priority.txt", log=log, fs=fs))
+        self.assertTrue(result.ok)
+        self.assertTrue(all(seen))
+        self.assertFalse(fs.exists("docs/old.html"))
+        self.assertFalse(fs.exists("docs/about.html"))
+        self.assertTrue(fs.isfile("docs/index.css"))
+
+    def test_scheduled_pack_publishes_priority_first(self):
+        fs = make_site(FILES)
+        self.assertTrue(build(BuildConfig(base_path="/ssg/", pack_path="site.pack", fs=fs)).ok)
+        fs.write_text("content/index.md", "# New home")
+        fs.write_text("content/blog/a/index.md", "# New A")
+
+        # once the tail starts the index has the new priority pages and
+        # still serves the previous tail pages
+        packed = []
+        def log(message: str):
+            if message.startswith("Generating page from content/blog/a/"):
+                pack = Pack.load(fs, "site.pack")
+                packed.append((pack.read("/index.html"), pack.read("/blog/a/index.html")))
+        result = build(BuildConfig(base_path="/ssg/", pack_path="site.pack", priority_path="priority.txt", log=log, fs=fs))
+        self.assertTrue(result.ok)
+        self.assertEqual(len(packed), 1)
+        self.assertIn(b"<title>New home</title>", packed[0][0])
+        self.assertIn(b"<title>A</title>", packed[0][1])
+        pack = Pack.load(fs, "site.pack")
+        self.assertIn(b"<title>New A</title>", pack.read("/blog/a/index.html"))
+        self.assertEqual(len(pack.entries), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
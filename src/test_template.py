@@ -0,0 +1,91 @@
+import unittest
+
+from template import RenderCache, Template, PARTIAL
+from fixtures import make_site
+
+PARTIALS = {
+    "partials/header.html": '<header><a href="/">Site</a></header>',
+    "partials/nav.md": "- [Home](/)\n- [Blog](/blog)",
+    "partials/heading.html": "<h1>{{ Title }}</h1>",
+    "partials/loop.html": "{{> loop }}",
+}
+
+
+class TestTemplate(unittest.TestCase):
+    def test_variables(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(template.render({"Title": "T", "Content": "<p>c</p>"}), b"<title>T</title><p>c</p>")
+        self.assertEqual(template.variables, {"Title", "Content"})
+
+    def test_unknown_variable_left_as_is(self):
+        template = Template("{{ Title }} {{ Other }}")
+        self.assertEqual(template.render({"Title": "T"}), b"T {{ Other }}")
+
+    def test_content_is_not_expanded(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render({"Title": "T", "Content": "{{ Title }}"}), b"T|{{ Title }}")
+
+    def test_static_partials_are_inlined(self):
+        fs = make_site(PARTIALS)
+        template = Template("{{> header }}{{> nav }}{{ Content }}", fs=fs, partials_dir="partials")
+        self.assertNotIn(PARTIAL, [kind for kind, _ in template.plan])
+        self.assertEqual(
+            template.render({"Content": "x"}),
+            b'<header><a href="/">Site</a></header>'
+            b'<div><ul><li><a href="/">Home</a></li><li><a href="/blog">Blog</a></li></ul></div>x',
+        )
+
+    def test_partials_base_path(self):
+        fs = make_site(PARTIALS)
+        template = Template("{{> header }}{{> nav }}", base_path="/ssg/", fs=fs, partials_dir="partials")
+        html = template.render({})
+        self.assertIn(b'<header><a href="/ssg/">Site</a></header>', html)
+        self.assertIn(b'<a href="/ssg/blog">Blog</a>', html)
+
+    def test_page_dependent_partial_is_cached_by_inputs(self):
+        fs = make_site(PARTIALS)
+        template = Template("{{> heading }}{{ Content }}", fs=fs, partials_dir="partials")
+        self.assertEqual(template.variables, {"Title", "Content"})
+        self.assertEqual(template.render({"Title": "A", "Content": "1"}), b"<h1>A</h1>1")
+        self.assertEqual(template.render({"Title": "A", "Content": "2"}), b"<h1>A</h1>2")
+        self.assertEqual(template.render({"Title": "B", "Content": "3"}), b"<h1>B</h1>3")
+        self.assertEqual(set(template.partials["heading"].cache), {("A",), ("B",)})
+
+    def test_content_partial_is_not_cached(self):
+        fs = make_site(PARTIALS)
+        fs.write_text("partials/article.html", "<article>{{ Content }}</article>")
+        template = Template("{{> article }}", fs=fs, partials_dir="partials")
+        self.assertEqual(template.render({"Content": "1"}), b"<article>1</article>")
+        self.assertEqual(template.render({"Content": "2"}), b"<article>2</article>")
+        self.assertEqual(len(template.partials["article"].cache), 0)
+
+    def test_partial_cache_is_bounded(self):
+        cache = RenderCache(max_entries=2)
+        cache.put("a", b"a")
+        cache.put("b", b"b")
+        cache.get("a")
+        cache.put("c", b"c")
+        self.assertEqual(list(cache), ["a", "c"])
+
+    def test_breadcrumbs(self):
+        template = Template("{{> breadcrumbs }}", base_path="/ssg/")
+        self.assertEqual(
+            template.render({"Url": "/blog/tom/"}),
+            b'<nav class="breadcrumbs"><a href="/ssg/">Home</a> / <a href="/ssg/blog/">blog</a></nav>',
+        )
+        template.render({"Url": "/blog/majesty/"})
+        self.assertEqual(list(template.partials["breadcrumbs"].cache), ["/blog/"])
+
+    def test_unknown_partial(self):
+        with self.assertRaises(Exception) as cm:
+            Template("{{> missing }}", fs=make_site(PARTIALS), partials_dir="partials")
+        self.assertEqual(str(cm.exception), "unknown partial: missing")
+
+    def test_recursive_partial(self):
+        with self.assertRaises(Exception) as cm:
+            Template("{{> loop }}", fs=make_site(PARTIALS), partials_dir="partials")
+        self.assertIn("recursive partial", str(cm.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from converter import markdown_to_html_node
+from transforms import (
+    Transform,
+    HeadingAnchors,
+    TableOfContents,
+    ExternalLinks,
+    UrlRewrite,
+    apply_transforms,
+    slugify,
+)
+
+
+class CountingTransform(Transform):
+    def begin(self):
+        self.count = 0
+
+    def visit(self, node):
+        self.count += 1
+
+
+class TestTransforms(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  My  favorite_characters "), "my-favorite-characters")
+        self.assertEqual(slugify("!!!"), "section")
+
+    def test_heading_anchors(self):
+        node = markdown_to_html_node("# Title\n\n## Intro\n\n## Intro")
+        apply_transforms(node, [HeadingAnchors()])
+        self.assertEqual(
+            node.to_html(),
+            '<div><h1 id="title"><span>Title</span></h1>'
+            '<h2 id="intro"><span>Intro</span></h2>'
+            '<h2 id="intro-1"><span>Intro</span></h2></div>',
+        )
+
+    def test_table_of_contents(self):
+        node = markdown_to_html_node("# Title\n\n## One\n\n### One A\n\n## Two")
+        toc = TableOfContents()
+        apply_transforms(node, [HeadingAnchors(), toc])
+        self.assertEqual(
+            toc.to_html(),
+            '<nav class="toc"><ul>'
+            '<li><a href="#one">One</a><ul><li><a href="#one-a">One A</a></li></ul></li>'
+            '<li><a href="#two">Two</a></li>'
+            '</ul></nav>',
+        )
+
+    def test_table_of_contents_empty(self):
+        toc = TableOfContents()
+        apply_transforms(markdown_to_html_node("just text"), [toc])
+        self.assertEqual(toc.to_html(), "")
+
+    def test_external_links(self):
+        node = ParentNode("p", [
+            LeafNode("a", "out", props={"href": "https://example.com"}),
+            LeafNode("a", "in", props={"href": "/blog"}),
+        ])
+        apply_transforms(node, [ExternalLinks()])
+        self.assertEqual(
+            node.to_html(),
+            '<p><a href="https://example.com" target="_blank" rel="noopener noreferrer">out</a><a href="/blog">in</a></p>',
+        )
+
+    def test_url_rewrite(self):
+        node = markdown_to_html_node("[home](/) ![img](/images/a.png) [ext](https://x.org) [proto](//cdn.org/a)")
+        apply_transforms(node, [UrlRewrite("/ssg/")])
+        html = node.to_html()
+        self.assertIn('href="/ssg/"', html)
+        self.assertIn('src="/ssg/images/a.png"', html)
+        self.assertIn('href="https://x.org"', html)
+        self.assertIn('href="//cdn.org/a"', html)
+
+    def test_single_traversal(self):
+        node = markdown_to_html_node("# Title\n\n- a [b](/b)\n- c\n\nsome **text**")
+        counter = CountingTransform()
+        visits = apply_transforms(node, [counter])
+        self.assertEqual(visits, counter.count)
+
+        counter = CountingTransform()
+        transforms = [HeadingAnchors(), TableOfContents(), ExternalLinks(), UrlRewrite("/x/"), counter]
+        self.assertEqual(apply_transforms(node, transforms), visits)
+        self.assertEqual(counter.count, visits)
+
+    def test_registration_order_per_node(self):
+        seen = []
+
+        class Record(Transform):
+            def __init__(self, name, tags=None):
+                self.name = name
+                self.tags = tags
+
+            def visit(self, node):
+                seen.append((self.name, node.tag))
+
+        node = ParentNode("h2", [LeafNode("span", "x")])
+        apply_transforms(node, [Record("a", ("h2",)), Record("b"), Record("c", ("h2",))])
+        self.assertEqual(seen, [("a", "h2"), ("b", "h2"), ("c", "h2"), ("b", "span")])
+
+
+if __name__ == "__main__":
+    unittest.main()
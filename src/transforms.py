@@ -0,0 +1,181 @@
+import re
+from htmlnode import HTMLNode, LeafNode, ParentNode
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+class Transform():
+    # tags this transform wants to see, None means every node
+    tags: tuple[str, ...] = None
+
+    def begin(self):
+        pass
+
+    def visit(self, node: HTMLNode):
+        pass
+
+    def key(self) -> tuple:
+        # identifies the configuration of the transform, per page state
+        # such as collected entries or _underscored flags is not part of it.
+        # only str, int, float, bool and None attributes are covered, a
+        # transform configured with lists, dicts or objects overrides key()
+        # or rendered blocks cached under its old settings are reused
+        config = sorted(
+            (k, v) for k, v in vars(self).items()
+            if not k.startswith('_') and isinstance(v, (str, int, float, bool, type(None)))
+        )
+        return (type(self).__name__, tuple(config))
+
+
+def apply_transforms(root: HTMLNode, transforms: list[Transform]) -> int:
+    # all transforms share one pre-order walk, each node is visited once
+    # no matter how many transforms are registered
+    any_tag = []
+    by_tag: dict[str, list] = {}
+    for transform in transforms:
+        transform.begin()
+        if transform.tags is None:
+            any_tag.append(transform.visit)
+            for visitors in by_tag.values():
+                visitors.append(transform.visit)
+        else:
+            for tag in transform.tags:
+                by_tag.setdefault(tag, list(any_tag)).append(transform.visit)
+
+    visits = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        visits += 1
+        for visit in by_tag.get(node.tag, any_tag):
+            visit(node)
+        if node.children:
+            stack.extend(reversed(node.children))
+    return visits
+
+
+def text_content(node: HTMLNode) -> str:
+    if node.children is None:
+        return node.value or ''
+    return ''.join(text_content(child) for child in node.children)
+
+
+def slugify(text: str) -> str:
+    slug = re.sub(r'[^\w\s-]', '', text.lower()).strip()
+    return re.sub(r'[\s_-]+', '-', slug) or 'section'
+
+
+def _set_prop(node: HTMLNode, key: str, value: str):
+    if node.props is None:
+        node.props = {}
+    node.props[key] = value
+
+
+class HeadingAnchors(Transform):
+    tags = HEADING_TAGS
+
+    def begin(self):
+        self.seen: dict[str, int] = {}
+
+    def visit(self, node: HTMLNode):
+        if node.props is not None and 'id' in node.props:
+            return
+        slug = slugify(text_content(node))
+        count = self.seen.get(slug, 0)
+        self.seen[slug] = count + 1
+        _set_prop(node, 'id', slug if count == 0 else f'{slug}-{count}')
+
+
+class TableOfContents(Transform):
+    # register after HeadingAnchors so ids are set when headings are visited
+    tags = HEADING_TAGS
+
+    def __init__(self, min_level: int = 2, max_level: int = 3):
+        self.min_level = min_level
+        self.max_level = max_level
+        self.entries: list[tuple[int, str, str]] = []
+
+    def begin(self):
+        self.entries = []
+
+    def visit(self, node: HTMLNode):
+        level = int(node.tag[1])
+        if level < self.min_level or level > self.max_level:
+            return
+        anchor = None if node.props is None else node.props.get('id')
+        self.entries.append((level, text_content(node), anchor))
+
+    def to_html_node(self) -> HTMLNode:
+        root = ParentNode('ul', [])
+        # stack of (level, list node) for the currently open lists
+        stack = [(self.min_level, root)]
+        for level, text, anchor in self.entries:
+            while level > stack[-1][0]:
+                parent = stack[-1][1]
+                if len(parent.children) == 0:
+                    parent.children.append(ParentNode('li', []))
+                nested = ParentNode('ul', [])
+                parent.children[-1].children.append(nested)
+                stack.append((stack[-1][0] + 1, nested))
+            while level < stack[-1][0]:
+                stack.pop()
+            if anchor is None:
+                item = LeafNode(None, text)
+            else:
+                item = LeafNode('a', text, props={'href': f'#{anchor}'})
+            stack[-1][1].children.append(ParentNode('li', [item]))
+        return root
+
+    def to_html(self) -> str:
+        if len(self.entries) == 0:
+            return ''
+        return ParentNode('nav', [self.to_html_node()], props={'class': 'toc'}).to_html()
+
+
+class ExternalLinks(Transform):
+    tags = ('a',)
+
+    def __init__(self, target: str = '_blank', rel: str = 'noopener noreferrer'):
+        self.target = target
+        self.rel = rel
+
+    def visit(self, node: HTMLNode):
+        href = '' if node.props is None else node.props.get('href') or ''
+        if href.startswith('http://') or href.startswith('https://'):
+            if self.target:
+                _set_prop(node, 'target', self.target)
+            if self.rel:
+                _set_prop(node, 'rel', self.rel)
+
+
+class CollectResources(Transform):
+    # records image sources and link targets as the tree is walked,
+    # register before UrlRewrite to see the urls as written
+    tags = ('a', 'img')
+
+    def begin(self):
+        self.images: list[str] = []
+        self.links: list[str] = []
+
+    def visit(self, node: HTMLNode):
+        if node.props is None:
+            return
+        if node.tag == 'img' and node.props.get('src'):
+            self.images.append(node.props['src'])
+        elif node.tag == 'a' and node.props.get('href'):
+            self.links.append(node.props['href'])
+
+
+class UrlRewrite(Transform):
+    tags = ('a', 'img')
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+
+    def visit(self, node: HTMLNode):
+        if node.props is None:
+            return
+        for key in ('href', 'src'):
+            url = node.props.get(key)
+            if url is not None and url.startswith('/') and not url.startswith('//'):
+                node.props[key] = self.base_path + url[1:]